@@ -0,0 +1,130 @@
+"""
+Local stand-ins for the services the pipeline talks to, for benchmarks.
+
+- Gemini and gTTS: the stub backend from pipeline.stub, switched on with
+  `use_stub_backend()` before any pipeline module is imported.
+- NewsAPI and article pages: `FakeNewsServer`, a threaded local HTTP server
+  answering /v2/everything like NewsAPI and serving an HTML page per article,
+  each after a configurable delay.
+"""
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+HEADLINES = [
+    "Ceasefire talks resume as envoys arrive in Geneva",
+    "Aid convoy reaches besieged city after week-long delay",
+    "Drone strikes hit energy infrastructure overnight",
+    "Parliament approves new defence budget amid protests",
+    "Refugee numbers climb as fighting spreads to the north",
+    "Grain corridor reopens under international monitoring",
+    "Cyberattack disrupts rail network across the region",
+    "Peacekeepers report violations along the buffer zone",
+    "Sanctions package targets arms suppliers and shipping",
+    "Hospitals run short of fuel as power cuts continue",
+    "Prisoner exchange frees dozens on both sides",
+    "Naval blockade tightens around southern ports",
+    "Mediators propose phased withdrawal of heavy weapons",
+    "Journalists detained near front line released",
+    "Winter offensive stalls in muddy terrain, analysts say",
+    "UN council deadlocked over humanitarian resolution",
+]
+QUERIES = ["war", "ceasefire", "aid", "sanctions", "refugees", "drone", "blockade", "peace talks"]
+_FILLER = (
+    "Officials said the situation remained fluid and that further talks were expected later in the week. "
+    "Residents described long queues for water and fuel, while local authorities urged calm. "
+    "Analysts cautioned that previous agreements had collapsed within days of being signed. "
+    "International observers called for independent access to the affected areas. "
+    "The ministry declined to comment on the reports but promised a statement on Friday. "
+)
+
+
+def use_stub_backend(model_latency=0.2, tts_latency=0.1, rate_limit=0.0, requests_per_minute=60000):
+    """Points the pipeline at the stub model and speech. Call before importing pipeline modules."""
+    os.environ.update({
+        "NEWS_MODEL_BACKEND": "stub",
+        "NEWS_STUB_LATENCY": str(model_latency),
+        "NEWS_STUB_TTS_LATENCY": str(tts_latency),
+        "NEWS_STUB_RATE_LIMIT": str(rate_limit),
+        "GEMINI_RPM": str(requests_per_minute),
+        "GEMINI_BURST": str(max(5, requests_per_minute // 60)),
+    })
+
+
+def article_html(index):
+    headline = HEADLINES[index % len(HEADLINES)]
+    rng = random.Random(index)
+    sentences = [s for s in _FILLER.split(". ") if s]
+    paragraphs = []
+    for _ in range(8):
+        rng.shuffle(sentences)
+        paragraphs.append(f"<p>{headline}. " + ". ".join(sentences).rstrip(".") + ".</p>")
+    return (
+        f"<html><head><title>{headline}</title></head><body>"
+        f"<article><h1>{headline}</h1>{''.join(paragraphs)}</article></body></html>"
+    )
+
+
+class FakeNewsServer:
+    """NewsAPI's /v2/everything plus /articles/<n> pages on localhost."""
+
+    def __init__(self, latency=0.05, page_latency=0.1):
+        self.latency = latency
+        self.page_latency = page_latency
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if parts.path == "/v2/everything":
+                    time.sleep(server.latency)
+                    self._send("application/json", json.dumps(server.everything(parse_qs(parts.query))))
+                elif parts.path.startswith("/articles/"):
+                    time.sleep(server.page_latency)
+                    self._send("text/html; charset=utf-8", article_html(int(parts.path.rsplit("/", 1)[1])))
+                else:
+                    self.send_error(404)
+
+            def _send(self, content_type, body):
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def everything(self, params):
+        query = params.get("q", ["war"])[0]
+        page_size = int(params.get("pageSize", ["20"])[0])
+        page = int(params.get("page", ["1"])[0])
+        offset = (sum(map(ord, query)) + (page - 1) * page_size) % 1000
+        articles = [
+            {
+                "title": f"{HEADLINES[(offset + i) % len(HEADLINES)]} ({query})",
+                "url": f"{self.url}/articles/{offset + i}",
+                "publishedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - i * 60)),
+                "source": {"name": "Fake Wire"},
+            }
+            for i in range(page_size)
+        ]
+        return {"status": "ok", "totalResults": 1000, "articles": articles}
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,218 @@
+"""
+End-to-end pipeline benchmark against local fakes (no network, no API keys).
+
+    python -m benchmarks.pipeline_benchmark --limit 40 --save benchmarks/baselines/pipeline.json
+    python -m benchmarks.pipeline_benchmark --limit 40 --compare benchmarks/baselines/pipeline.json
+
+Replays the scans in data/raw_images and a set of headlines through each
+stage. Gemini and gTTS are the stub backend (pipeline.stub); NewsAPI and
+the article pages are served by benchmarks.fakes.FakeNewsServer. Every
+latency is configurable. Each stage runs on `--workers` threads, and the
+report gives p50/p95/p99 latency, throughput and peak traced memory per
+stage. Runs happen in a scratch directory, so caches start cold and the
+real data/ folder is never touched.
+
+--compare exits non-zero if any stage's p95 latency or peak memory grew, or
+its throughput fell, by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import HEADLINES, QUERIES, FakeNewsServer, use_stub_backend
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGES_DIR = os.path.join(REPO_ROOT, "data", "raw_images")
+BASELINE_PATH = os.path.join("benchmarks", "baselines", "pipeline.json")
+COMPARED = (("p95_ms", 1), ("peak_mb", 1), ("throughput", -1))  # (metric, +1 if higher is worse / -1 if lower is)
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def run_stage(name, fn, items, workers):
+    """Runs `fn(item)` for every item on `workers` threads; returns (results, stats)."""
+    latencies = []
+    errors = []
+
+    def timed(item):
+        start = time.perf_counter()
+        try:
+            return fn(item)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            return None
+        finally:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(timed, items))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - base
+
+    stats = {
+        "count": len(items),
+        "errors": len(errors),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": statistics.mean(latencies) if latencies else 0.0,
+        "throughput": len(items) / elapsed if elapsed else 0.0,
+        "peak_mb": peak / 1024 / 1024,
+    }
+    print(f"  {name:<11} n={stats['count']:<4} p50 {stats['p50_ms']:8.1f}  p95 {stats['p95_ms']:8.1f}  "
+          f"p99 {stats['p99_ms']:8.1f} ms  {stats['throughput']:7.1f}/s  peak {stats['peak_mb']:7.1f} MB"
+          + (f"  ⚠️ {len(errors)} errors (first: {errors[0]})" if errors else ""))
+    return results, stats
+
+
+def run_benchmark(images, workers, news_latency, page_latency):
+    # Imported only now, after use_stub_backend() has configured the environment
+    from news import live_news_api
+    from ocr_module.engine import DEFAULT_ENGINE
+    from pipeline import core, gemini
+    from pipeline.search import get_search_index
+
+    # Pay one-time costs (lexicons, parsers, SDK imports) before anything is timed
+    import newspaper  # noqa: F401
+    from sentiment.analyzer import score_text
+    score_text("Warm-up sentence.")
+    gemini.get_model()
+
+    stages = {}
+    print(f"🏁 {len(images)} scans, {len(HEADLINES)} headlines, {workers} workers")
+    with FakeNewsServer(news_latency, page_latency) as server:
+        live_news_api.NEWS_URL = f"{server.url}/v2/everything"
+
+        regions, stages["preprocess"] = run_stage(
+            "preprocess", lambda path: DEFAULT_ENGINE.encode_regions(DEFAULT_ENGINE.prepare(path)), images, workers
+        )
+        texts, stages["ocr"] = run_stage("ocr", gemini.extract_regions, [r for r in regions if r], workers)
+        texts = [t for t in texts if t]
+        summaries, stages["summarize"] = run_stage("summarize", gemini.summarize_text, texts, workers)
+        summaries = [s for s in summaries if s]
+        _, stages["format"] = run_stage("format", gemini.format_news, summaries, workers)
+        _, stages["report"] = run_stage("report", lambda path: core.report(core.NO_JOB, path), images, workers)
+
+        def live_news(query):
+            live_news_api.clear_cache()  # Measure the round trip, not the in-memory cache
+            return live_news_api.fetch_live_news(query, page_size=len(HEADLINES))
+
+        listings, stages["live_news"] = run_stage("live_news", live_news, QUERIES, workers)
+        urls = [url for listing in listings if listing for _, url in listing if url]
+        urls = list(dict.fromkeys(urls))[:max(len(HEADLINES), len(images))]
+        article_summaries, stages["article"] = run_stage(
+            "article", lambda url: core.summarize_url(core.NO_JOB, url), urls, workers
+        )
+        article_summaries = [s for s in article_summaries if s]
+        _, stages["sentiment"] = run_stage(
+            "sentiment", lambda text: core.sentiment_score(core.NO_JOB, text), article_summaries + summaries, workers
+        )
+        _, stages["tts"] = run_stage("tts", lambda text: core.speech(core.NO_JOB, text), article_summaries, workers)
+        words = [w for headline in HEADLINES for w in headline.split() if len(w) > 4]
+        _, stages["search"] = run_stage("search", get_search_index().search, words, workers)
+    return stages
+
+
+def git_version():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(result, baseline, tolerance):
+    """Prints stage-by-stage changes against `baseline`; returns the regressed (stage, metric) pairs."""
+    regressions = []
+    print(f"\n📐 Against baseline {baseline.get('version', '?')} (tolerance {tolerance:.0%}):")
+    for stage, stats in result["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if not old:
+            print(f"  {stage:<11} (not in baseline)")
+            continue
+        cells = []
+        for metric, direction in COMPARED:
+            before, after = old.get(metric, 0), stats[metric]
+            change = (after - before) / before if before else 0.0
+            worse = change * direction > tolerance
+            if worse:
+                regressions.append((stage, metric))
+            cells.append(f"{metric} {before:.1f}→{after:.1f} ({change:+.0%}){' ❌' if worse else ''}")
+        print(f"  {stage:<11} " + "  ".join(cells))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage against local fakes.")
+    parser.add_argument("--images", default=IMAGES_DIR)
+    parser.add_argument("--limit", type=int, default=20, help="Scans to replay (0 for all)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--model-latency", type=float, default=0.2, help="Seconds per fake Gemini request")
+    parser.add_argument("--tts-latency", type=float, default=0.1, help="Seconds per fake gTTS chunk")
+    parser.add_argument("--news-latency", type=float, default=0.05, help="Seconds per fake NewsAPI request")
+    parser.add_argument("--page-latency", type=float, default=0.1, help="Seconds per fake article page")
+    parser.add_argument("--save", nargs="?", const=BASELINE_PATH, default=None, help="Write results as a baseline")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, default=None, help="Baseline to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative change before failing")
+    args = parser.parse_args(argv)
+
+    use_stub_backend(args.model_latency, args.tts_latency)
+    images_dir = os.path.abspath(args.images)
+    images = sorted(
+        os.path.join(images_dir, name) for name in os.listdir(images_dir)
+        if name.lower().endswith((".png", ".jpg", ".jpeg", ".webp"))
+    )
+    if args.limit:
+        images = images[:args.limit]
+    save_path = os.path.abspath(args.save) if args.save else None
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+
+    cwd = os.getcwd()
+    tracemalloc.start()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)  # Fresh caches, indexes and stores for every run
+        try:
+            stages = run_benchmark(images, args.workers, args.news_latency, args.page_latency)
+        finally:
+            os.chdir(cwd)
+    tracemalloc.stop()
+
+    result = {
+        "version": git_version(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("save", "compare", "images", "tolerance")},
+        "stages": stages,
+    }
+    if save_path:
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        with open(save_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Saved to {save_path}")
+    if compare_path:
+        with open(compare_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != result["config"]:
+            print("⚠️ Baseline was recorded with different settings; numbers may not be comparable.")
+        if compare(result, baseline, args.tolerance):
+            return 1
+    return 1 if any(s["errors"] for s in stages.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
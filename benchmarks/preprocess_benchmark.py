@@ -0,0 +1,110 @@
+"""
+Upload size and OCR quality: old preprocessing vs PreprocessEngine.
+
+    python -m benchmarks.preprocess_benchmark            # bytes + timing only
+    python -m benchmarks.preprocess_benchmark --extract  # also OCR with Gemini (needs GEMINI_API_KEY)
+    python -m benchmarks.preprocess_benchmark --all      # every scan in the folder, not just the CSV's
+
+Baseline is what `preprocess_image` + `Image.fromarray` used to upload:
+the full-size CLAHE array, which the Gemini SDK encodes as lossless WebP.
+The engine columns follow the path the pipeline takes (`process_regions`):
+multi-article pages are split into blocks, each block one model request.
+Quality is word-level similarity to the `Article` column of
+data/news_extracted.csv (the existing OCR output is the ground truth).
+"""
+import argparse
+import csv
+import difflib
+import io
+import os
+import re
+import time
+
+from PIL import Image
+
+from ocr_module.engine import PreprocessEngine
+from ocr_module.preprocess import preprocess_image
+
+CSV_PATH = os.path.join("data", "news_extracted.csv")
+IMAGES_DIR = os.path.join("data", "raw_images")
+
+
+def baseline_upload(image_path):
+    buffer = io.BytesIO()
+    Image.fromarray(preprocess_image(image_path)).save(buffer, format="webp", lossless=True)
+    return buffer.getvalue()
+
+
+def text_similarity(a, b):
+    words = lambda text: re.findall(r"\w+", text.lower())
+    return difflib.SequenceMatcher(None, words(a), words(b), autojunk=False).ratio()
+
+
+def load_ground_truth(csv_path, images_dir):
+    truth = {}
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            path = os.path.join(images_dir, row["Image"])
+            if row.get("Article") and os.path.exists(path):
+                truth.setdefault(path, row["Article"])
+    return truth
+
+
+def run(csv_path=CSV_PATH, images_dir=IMAGES_DIR, extract=False, binarize=False, all_images=False):
+    engine = PreprocessEngine(binarize=binarize)
+    truth = load_ground_truth(csv_path, images_dir)
+    if all_images:  # Scans without ground truth are measured but not scored
+        from pipeline.batch import list_images
+
+        truth = {path: truth.get(path) for path in list_images(images_dir)}
+    if extract:
+        from pipeline.gemini import extract_regions
+
+    totals = {"baseline_bytes": 0, "engine_bytes": 0, "baseline_s": 0.0, "engine_s": 0.0, "requests": 0, "split": 0}
+    scores = []
+    print(f"{'image':44} {'baseline':>10} {'engine':>10} {'ratio':>6} {'regions':>7}" + ("  quality" if extract else ""))
+    for path, article in truth.items():
+        start = time.perf_counter()
+        baseline = baseline_upload(path)
+        totals["baseline_s"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        regions = engine.process_regions(path)
+        totals["engine_s"] += time.perf_counter() - start
+
+        engine_bytes = sum(len(region.data) for region in regions)
+        totals["baseline_bytes"] += len(baseline)
+        totals["engine_bytes"] += engine_bytes
+        totals["requests"] += len(regions)
+        totals["split"] += len(regions) > 1
+        line = (f"{os.path.basename(path)[:44]:44} {len(baseline):>10} {engine_bytes:>10} "
+                f"{engine_bytes / len(baseline):>6.2f} {len(regions):>7}")
+        if extract and article:
+            score = text_similarity(extract_regions(regions), article)
+            scores.append(score)
+            line += f"  {score:.2f}"
+        print(line)
+
+    if not truth:
+        print("⚠️ No images from the CSV were found.")
+        return totals
+    print(
+        f"\nTotal uploaded: {totals['baseline_bytes']:,} → {totals['engine_bytes']:,} bytes "
+        f"({totals['engine_bytes'] / totals['baseline_bytes']:.0%}); "
+        f"preprocess time {totals['baseline_s']:.2f}s → {totals['engine_s']:.2f}s"
+    )
+    print(f"Model requests: {totals['requests']} for {len(truth)} scans ({totals['split']} split into blocks)")
+    if scores:
+        print(f"Mean similarity to ground truth: {sum(scores) / len(scores):.2f}")
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--images", default=IMAGES_DIR)
+    parser.add_argument("--extract", action="store_true", help="Run Gemini OCR and score against the CSV")
+    parser.add_argument("--binarize", action="store_true")
+    parser.add_argument("--all", action="store_true", help="Measure every scan in --images")
+    args = parser.parse_args()
+    run(args.csv, args.images, args.extract, args.binarize, args.all)
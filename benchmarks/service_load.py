@@ -0,0 +1,175 @@
+"""
+Load test for the HTTP service (pipeline.service).
+
+    python -m benchmarks.service_load --clients 64 --requests 2000 --latency 0.2
+
+By default a service is started with the stub model backend in a scratch
+directory, so nothing touches Gemini, gTTS or the real caches. Pass --url to
+hit a service that is already running instead. Each client keeps one
+keep-alive connection and sends a mix of summarize, format and sentiment
+requests (plus OCR uploads with --image). Reports throughput, latency
+percentiles and how many requests were turned away with 503.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_TEXT = (
+    "Officials confirmed that talks resumed on Tuesday after a week-long pause. "
+    "Delegates said a ceasefire along the northern front was the first priority, "
+    "while aid agencies warned that supplies to the region were running low."
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_stub_service(workdir, concurrency, queue, latency, rpm):
+    port = free_port()
+    env = dict(
+        os.environ, NEWS_MODEL_BACKEND="stub", NEWS_STUB_LATENCY=str(latency), GEMINI_RPM=str(rpm),
+        PYTHONPATH=REPO_ROOT,
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "pipeline.service", "--port", str(port),
+         "--concurrency", str(concurrency), "--queue", str(queue)],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("Service exited during startup.")
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Service did not start in time.")
+
+
+def build_requests(image_bytes):
+    mix = [
+        ("/summarize", "application/json", json.dumps({"text": SAMPLE_TEXT}).encode()),
+        ("/format", "application/json", json.dumps({"text": SAMPLE_TEXT}).encode()),
+        ("/sentiment", "application/json", json.dumps({"text": SAMPLE_TEXT}).encode()),
+    ]
+    if image_bytes:
+        mix.append(("/ocr", "application/octet-stream", image_bytes))
+    return mix
+
+
+async def request(reader, writer, host, path, content_type, body):
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    length = 0
+    for line in lines[1:]:
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(":", 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def client(url, mix, counter, total, results, offset):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+    try:
+        while True:
+            index = counter[0]
+            if index >= total:
+                return
+            counter[0] += 1
+            # Vary the text per request so the response cache doesn't answer everything
+            path, content_type, body = mix[(index + offset) % len(mix)]
+            if content_type == "application/json":
+                text = json.loads(body)["text"] + f" (request {index})"
+                body = json.dumps({"text": text}).encode()
+            start = time.perf_counter()
+            try:
+                status = await request(reader, writer, parts.netloc, path, content_type, body)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                results.append((path, 0, time.perf_counter() - start))
+                writer.close()
+                reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+                continue
+            results.append((path, status, time.perf_counter() - start))
+    finally:
+        writer.close()
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+async def run_load(url, clients, total, image_bytes):
+    mix = build_requests(image_bytes)
+    counter, results = [0], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(url, mix, counter, total, results, i) for i in range(clients)))
+    return results, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the news HTTP service.")
+    parser.add_argument("--url", default=None, help="Existing service to test (default: start a stub one)")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--image", default=None, help="Also upload this scan to /ocr")
+    parser.add_argument("--concurrency", type=int, default=8, help="Service workers (stub service only)")
+    parser.add_argument("--queue", type=int, default=64, help="Service queue size (stub service only)")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub model latency in seconds")
+    parser.add_argument("--rpm", type=int, default=60000, help="Model requests per minute the scheduler allows")
+    args = parser.parse_args(argv)
+
+    image_bytes = None
+    if args.image:
+        with open(args.image, "rb") as f:
+            image_bytes = f.read()
+
+    process = None
+    with tempfile.TemporaryDirectory() as workdir:
+        url = args.url
+        if url is None:
+            process, url = start_stub_service(workdir, args.concurrency, args.queue, args.latency, args.rpm)
+        try:
+            results, elapsed = asyncio.run(run_load(url, args.clients, args.requests, image_bytes))
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+
+    ok = [latency * 1000 for _, status, latency in results if status == 200]
+    rejected = sum(1 for _, status, _ in results if status == 503)
+    failed = len(results) - len(ok) - rejected
+    print(f"📊 {len(results)} requests from {args.clients} clients in {elapsed:.2f} s "
+          f"({len(ok) / elapsed:.1f} ok/s)")
+    print(f"   ok {len(ok)}, rejected (503) {rejected}, failed {failed}")
+    if ok:
+        print(f"   latency ms: p50 {percentile(ok, 50):.0f}, p95 {percentile(ok, 95):.0f}, "
+              f"p99 {percentile(ok, 99):.0f}, mean {statistics.mean(ok):.0f}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Cold-start benchmark: import time of `main` and time until the window is shown.
+
+    python -m benchmarks.startup_benchmark --runs 5 --max-window-ms 800
+
+Each run is a fresh interpreter so nothing is warm. Exits non-zero if a
+median goes over its limit, so it can guard against startup regressions.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+qt_ready = time.perf_counter()
+import main
+imported = time.perf_counter()
+window = main.NewsApp()
+window.show()
+app.processEvents()
+shown = time.perf_counter()
+heavy = [m for m in ("google.generativeai", "cv2", "gtts", "textblob", "newspaper", "requests", "PyQt6.QtMultimedia") if m in sys.modules]
+print(json.dumps({
+    "import_ms": (imported - qt_ready) * 1000,
+    "window_ms": (shown - start) * 1000,
+    "heavy_modules": heavy,
+}))
+"""
+
+
+def run_once(offscreen):
+    env = dict(os.environ)
+    if offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, env=env, cwd=os.getcwd())
+    total = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["process_ms"] = total
+    return sample
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure app cold-start time.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--offscreen", action="store_true", help="Use Qt's offscreen platform (no display needed)")
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-window-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    samples = [run_once(args.offscreen) for _ in range(args.runs)]
+    medians = {key: statistics.median(s[key] for s in samples) for key in ("import_ms", "window_ms", "process_ms")}
+    print(f"import main:        {medians['import_ms']:8.1f} ms")
+    print(f"start → window:     {medians['window_ms']:8.1f} ms")
+    print(f"whole process:      {medians['process_ms']:8.1f} ms")
+    heavy = samples[-1]["heavy_modules"]
+    print(f"heavy modules at startup: {', '.join(heavy) if heavy else 'none'}")
+
+    failed = False
+    if args.max_import_ms is not None and medians["import_ms"] > args.max_import_ms:
+        print(f"❌ import time over {args.max_import_ms} ms")
+        failed = True
+    if args.max_window_ms is not None and medians["window_ms"] > args.max_window_ms:
+        print(f"❌ time-to-window over {args.max_window_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
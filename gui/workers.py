@@ -0,0 +1,154 @@
+"""
+Background jobs for the Qt GUI.
+
+Jobs run on a QThreadPool and talk back to widgets only through queued
+signals. Each job lives in a named slot: submitting to a busy slot cancels
+the job already there, so e.g. clicking a second headline supersedes the
+first fetch instead of queueing behind it. A cancelled job's results are
+dropped, and the job itself stops at its next `job.check()`. Jobs that
+run for the life of the app (the news watcher) get a thread of their own
+instead of holding one of the pool's.
+"""
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# Jobs mostly wait on the network, and a superseded job keeps its thread until
+# its next `job.check()`, so don't size the pool by CPU count
+MAX_THREADS = 8
+SHUTDOWN_WAIT_MS = 3000  # How long closing the app waits for cancelled jobs to stop
+
+
+class CancelledError(Exception):
+    pass
+
+
+class WorkerSignals(QObject):
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    progress = pyqtSignal(int)
+    chunk = pyqtSignal(str)
+    status = pyqtSignal(str)
+    done = pyqtSignal()  # Always emitted, even when cancelled
+
+
+class Worker(QRunnable):
+    """Runs `fn(job, *args, **kwargs)`; `job` is this worker."""
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        """Raises CancelledError if the job was cancelled or superseded."""
+        if self.cancelled:
+            raise CancelledError()
+
+    def progress(self, value):
+        if not self.cancelled:
+            self._emit("progress", int(value))
+
+    def chunk(self, text):
+        if not self.cancelled:
+            self._emit("chunk", text)
+
+    def status(self, text):
+        if not self.cancelled:
+            self._emit("status", text)
+
+    def _emit(self, name, *args):
+        try:
+            getattr(self.signals, name).emit(*args)
+        except RuntimeError:
+            pass  # Signals already deleted: the app is closing
+
+    def run(self):
+        try:
+            self.check()
+            result = self.fn(self, *self.args, **self.kwargs)
+            if not self.cancelled:
+                self._emit("result", result)
+        except CancelledError:
+            pass
+        except Exception as e:
+            if not self.cancelled:
+                self._emit("error", str(e))
+        finally:
+            self._emit("done")
+
+
+class WorkerPool(QObject):
+    busy_changed = pyqtSignal(str, bool)  # (slot, busy)
+
+    def __init__(self, max_threads=MAX_THREADS, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self._slots = {}
+
+    def submit(self, slot, fn, *args, on_result=None, on_error=None, on_progress=None, on_chunk=None,
+               on_status=None, dedicated=False, **kwargs):
+        """
+        Starts `fn` in `slot`, cancelling whatever was running there.
+        Callbacks run on the GUI thread and are skipped once the job is cancelled.
+        `dedicated=True` runs it on a daemon thread of its own rather than the pool.
+        """
+        self.cancel(slot)
+        worker = Worker(fn, *args, **kwargs)
+
+        def guard(callback):
+            return lambda *a: None if worker.cancelled else callback(*a)
+
+        if on_result:
+            worker.signals.result.connect(guard(on_result))
+        if on_error:
+            worker.signals.error.connect(guard(on_error))
+        if on_progress:
+            worker.signals.progress.connect(guard(on_progress))
+        if on_chunk:
+            worker.signals.chunk.connect(guard(on_chunk))
+        if on_status:
+            worker.signals.status.connect(guard(on_status))
+        worker.signals.done.connect(lambda: self._release(slot, worker))
+
+        self._slots[slot] = worker
+        self.busy_changed.emit(slot, True)
+        if dedicated:
+            threading.Thread(target=worker.run, name=f"job-{slot}", daemon=True).start()
+        else:
+            self.pool.start(worker)
+        return worker
+
+    def cancel(self, slot):
+        worker = self._slots.pop(slot, None)
+        if worker is not None:
+            worker.cancel()
+            self.busy_changed.emit(slot, False)
+
+    def cancel_all(self):
+        for slot in list(self._slots):
+            self.cancel(slot)
+
+    def shutdown(self, wait_ms=SHUTDOWN_WAIT_MS):
+        """Cancels every job and waits for the pool's threads to stop (before the app tears down)."""
+        self.cancel_all()
+        self.pool.waitForDone(wait_ms)
+
+    def is_busy(self, slot):
+        return slot in self._slots
+
+    def _release(self, slot, worker):
+        if self._slots.get(slot) is worker:
+            del self._slots[slot]
+            self.busy_changed.emit(slot, False)
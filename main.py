@@ -1,45 +1,65 @@
 import sys
 import os
-import google.generativeai as genai
-from PIL import Image
-import time
-import cv2
-from textblob import TextBlob
-import random
-import numpy as np
-from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PyQt6.QtGui import QPixmap
+from PyQt6.QtGui import QPixmap, QTextCursor
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout,
-    QPushButton, QFileDialog, QTextEdit, QListWidget, QProgressBar, QSlider, QHBoxLayout ,QLabel
+    QPushButton, QFileDialog, QTextEdit, QLineEdit, QListWidget, QProgressBar, QSlider, QHBoxLayout ,QLabel
 )
 from PyQt6.QtCore import QTimer, Qt, QThread, pyqtSignal, QUrl
-from tts.text_to_speech import generate_speech
-from ocr_module.preprocess import preprocess_image 
-from news.live_news_api import fetch_live_news
-import newspaper  # Requires the `newspaper3k` library
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-AUDIO_OUTPUT = os.path.join("data", "audio", "output_news.mp3")
+from tts.audio_cache import AudioStore
+from news.article_fetcher import ArticlePrefetcher
+from gui.workers import WorkerPool
+from pipeline import core
+# ⚡ Heavy modules (Gemini SDK, OpenCV, gTTS, requests, QtMultimedia) are imported on first use
 wav_path = "data/audio/output_news.wav"
 
 class AudioThread(QThread):
     progress = pyqtSignal(int)
-    finished = pyqtSignal()
+    chunk_ready = pyqtSignal(str, object)  # (audio path, MouthTimeline or None)
+    error = pyqtSignal(str)
+    finished = pyqtSignal(str, object)  # Full report audio and its timeline
 
-    def __init__(self, text, output_file):
+    def __init__(self, text, store, doc_key=None):
         super().__init__()
         self.text = text
-        self.output_file = output_file
+        self.store = store
+        self.doc_key = doc_key  # Article store key to record the audio under
 
     def run(self):
-        for i in range(1, 101, 10):  # Simulate progress
-            self.progress.emit(i)
-            time.sleep(0.3)
+        from tts.text_to_speech import generate_speech_chunks, report_audio_path, store_report_audio
+        from tts.lipsync import load_timeline
+        from pipeline.store import get_store
 
-        generate_speech(self.text, self.output_file)
+        try:
+            cached = report_audio_path(self.text, self.store)
+            if cached:  # ⚡ Same report as before: play instantly
+                timeline = load_timeline(cached)
+                self.chunk_ready.emit(cached, timeline)
+                self.progress.emit(100)
+                self.finished.emit(cached, timeline)
+                if self.doc_key:
+                    get_store().append(self.doc_key, audio=cached)
+                return
+
+            paths = []
+            for path in generate_speech_chunks(
+                self.text, self.store,
+                progress=lambda done, total: self.progress.emit(done * 100 // total),
+            ):
+                paths.append(path)
+                self.chunk_ready.emit(path, load_timeline(path))  # Start playing while later chunks synthesize
+
+            report_path = store_report_audio(self.text, paths, self.store)
+            report_timeline = load_timeline(report_path)
+            if self.doc_key:
+                get_store().append(self.doc_key, audio=report_path)
+        except Exception as e:
+            self.error.emit(f"⚠️ Audio generation failed: {e}")
+            return
         self.progress.emit(100)
-        self.finished.emit()
-        
+        self.finished.emit(report_path, report_timeline)
+
+
 class NewsApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -107,6 +127,9 @@ class NewsApp(QMainWindow):
 
 
 
+        self.workers = WorkerPool()
+        self.workers.busy_changed.connect(self.on_job_busy)
+
         self.tabs = QTabWidget()
         self.setCentralWidget(self.tabs)
 
@@ -121,10 +144,20 @@ class NewsApp(QMainWindow):
         self.tabs.addTab(self.tab_live_news, "Live News")
         self.tabs.addTab(self.tab_settings, "Settings")
 
+        # ⚡ Only the first tab is built up front; the rest on first visit
         self.init_main_tab()
-        self.init_options_tab()
-        self.init_live_news_tab()
-        self.init_settings_tab()
+        self.tab_initializers = {
+            self.tab_options: self.init_options_tab,
+            self.tab_live_news: self.init_live_news_tab,
+            self.tab_settings: self.init_settings_tab,
+        }
+        self.tabs.currentChanged.connect(self.ensure_tab)
+
+    def ensure_tab(self, index):
+        """Builds a tab's widgets the first time it is shown."""
+        init = self.tab_initializers.pop(self.tabs.widget(index), None)
+        if init:
+            init()
 
     def init_main_tab(self):
         layout = QVBoxLayout()
@@ -144,21 +177,27 @@ class NewsApp(QMainWindow):
 
         self.avatar_label = QLabel()
         self.avatar_closed = QPixmap("assets/reporter/close.png")
-        self.avatar_open = QPixmap("assets/reporter/open.png")
+        self.avatar_open = None  # Loaded when the avatar first speaks
         self.avatar_label.setPixmap(self.avatar_closed)  # Default closed mouth
         self.avatar_label.setFixedSize(400, 400)  # Set a fixed size
         self.avatar_label.setScaledContents(True)  # Scale the image properly
 
+        # ⏳ **Background job progress & cancel**
+        self.task_progress_bar = QProgressBar()
+        self.task_progress_bar.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.task_progress_bar.hide()
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_job)
+        self.cancel_button.hide()
+
         self.audio_progress_bar = QProgressBar()
         self.audio_progress_bar.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         self.audio_progress_bar.setValue(0)
         self.audio_progress_bar.hide()
 
-        # 🎵 **Media Player & Audio Output**
-        self.media_player = QMediaPlayer()
-        self.audio_output = QAudioOutput()
-        self.media_player.setAudioOutput(self.audio_output)
+        # 🎵 **Media Player & Audio Output** (created on first use)
+        self.media_player = None
 
         # 🔊 **Slider for Audio Seek**
         self.audio_slider = QSlider(Qt.Orientation.Horizontal)
@@ -184,6 +223,10 @@ class NewsApp(QMainWindow):
         layout.addWidget(self.upload_button)
         layout.addLayout(text_avatar_layout)
         layout.addWidget(self.process_button)
+        task_layout = QHBoxLayout()
+        task_layout.addWidget(self.task_progress_bar)
+        task_layout.addWidget(self.cancel_button)
+        layout.addLayout(task_layout)
         layout.addWidget(self.audio_button)
         layout.addWidget(self.audio_progress_bar)
         layout.addWidget(self.audio_slider)
@@ -193,14 +236,112 @@ class NewsApp(QMainWindow):
         button_layout.addWidget(self.resume_button)
         button_layout.addWidget(self.stop_button)
         layout.addLayout(button_layout) 
+
+        # 🛰️ **Ready reports** prepared in the background by the news watcher
+        self.ready_label = QLabel("🛰️ Ready reports")
+        self.ready_list = QListWidget()
+        self.ready_list.setMaximumHeight(120)
+        self.ready_list.itemClicked.connect(self.open_ready_report)
+        layout.addWidget(self.ready_label)
+        layout.addWidget(self.ready_list)
         
         self.tab_main.setLayout(layout)
 
-        # 🎵 **Connect Signals for Audio Progress**
-        self.media_player.positionChanged.connect(self.update_slider)
-        self.media_player.positionChanged.connect(self.update_avatar_animation)
-        self.media_player.durationChanged.connect(self.update_slider_range)
+        self.audio_store = AudioStore()
+        self.audio_queue = []  # Synthesized chunks waiting to be played
+        self.chunk_playing = False
+        self.report_audio = None  # Full audio of the current report, once built
+        self.doc_key = None  # Store/search key of the scan or article shown (see show_doc)
+        self.doc_text = None  # Exactly what was shown for it; once the text differs, the key no longer applies
+        self.report_timeline = None
+        self.current_timeline = None  # Mouth-open timeline of whatever is playing
+        self.mouth_open = False
+        self.load_ready_reports()
+        QTimer.singleShot(2000, self.start_watcher)  # Keep startup quick
    
+    def load_ready_reports(self):
+        from pipeline.watcher import ready_reports
+
+        self.ready_list.clear()
+        for entry in ready_reports():
+            self.ready_list.addItem(self.ready_item(entry["title"], entry["url"]))
+        self.ready_label.setVisible(self.ready_list.count() > 0)
+        self.ready_list.setVisible(self.ready_list.count() > 0)
+
+    @staticmethod
+    def ready_item(title, url):
+        from PyQt6.QtWidgets import QListWidgetItem
+
+        item = QListWidgetItem(f"🎧 {title}")
+        item.setData(Qt.ItemDataRole.UserRole, url)
+        return item
+
+    def start_watcher(self):
+        """Prepares new stories in the background when NEWS_WATCH_KEYWORDS is set."""
+        from pipeline import watcher
+
+        if watcher.WATCH_KEYWORDS:
+            self.workers.submit(
+                "watcher", watcher.watch,
+                on_chunk=self.add_ready_report,
+                on_error=lambda e: print(f"⚠️ News watcher stopped: {e}"),
+                dedicated=True,  # Runs for the life of the app; keeps the pool free for clicks
+            )
+
+    def add_ready_report(self, url):
+        from pipeline.store import get_store
+
+        article = get_store().get(url)
+        if not article:
+            return
+        for row in range(self.ready_list.count()):
+            if self.ready_list.item(row).data(Qt.ItemDataRole.UserRole) == url:
+                self.ready_list.takeItem(row)
+                break
+        self.ready_list.insertItem(0, self.ready_item(article["title"] or url, url))
+        self.ready_label.show()
+        self.ready_list.show()
+
+    def open_ready_report(self, item):
+        """Shows a prepared report and plays its audio (already synthesized, so it starts at once)."""
+        from pipeline.store import get_store
+
+        url = item.data(Qt.ItemDataRole.UserRole)
+        article = get_store().get(url)
+        if not article or not article["report"]:
+            self.extracted_text.setText("⚠️ This report is no longer available.")
+            return
+        self.workers.cancel("main")
+        self.show_doc(url, article["report"])
+        self.play_news_audio()
+
+    def show_doc(self, key, text=None):
+        """Shows `text` (or keeps what was streamed in) as the content of document `key`."""
+        if text is not None:
+            self.extracted_text.setText(text)
+        self.doc_key = key
+        self.doc_text = self.extracted_text.toPlainText()
+
+    def current_doc_key(self):
+        """Key of the document on screen, or None if the text box holds anything else."""
+        return self.doc_key if self.extracted_text.toPlainText() == self.doc_text else None
+
+    def ensure_media_player(self):
+        """Creates the player on first use: QtMultimedia is slow to load."""
+        if self.media_player is None:
+            from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
+
+            self.media_player = QMediaPlayer()
+            self.audio_output = QAudioOutput()
+            self.media_player.setAudioOutput(self.audio_output)
+
+            # 🎵 **Connect Signals for Audio Progress**
+            self.media_player.positionChanged.connect(self.update_slider)
+            self.media_player.positionChanged.connect(self.update_avatar_animation)
+            self.media_player.durationChanged.connect(self.update_slider_range)
+            self.media_player.mediaStatusChanged.connect(self.on_media_status)
+        return self.media_player
+
     def init_options_tab(self):
         layout = QVBoxLayout()
 
@@ -222,19 +363,57 @@ class NewsApp(QMainWindow):
         layout.addWidget(self.sentiment_button)
 
         self.tab_options.setLayout(layout)
+    def start_job(self, fn, *args, status, on_result=None, on_chunk=None):
+        """Runs a job for the main text view in the background, superseding any running one."""
+        self.extracted_text.setText(status)
+        self.task_progress_bar.setValue(0)
+        self.workers.submit(
+            "main", fn, *args,
+            on_result=on_result or self.extracted_text.setText,
+            on_error=lambda e: self.extracted_text.setText(f"⚠️ Error: {e}"),
+            on_progress=self.task_progress_bar.setValue,
+            on_chunk=on_chunk,
+            on_status=self.extracted_text.setText,
+        )
+
+    def on_job_busy(self, slot, busy):
+        if slot == "main":
+            self.task_progress_bar.setVisible(busy)
+            self.cancel_button.setVisible(busy)
+            self.process_button.setEnabled(not busy)
+        elif slot == "live_news":
+            self.fetch_news_button.setEnabled(not busy)
+        elif slot == "search":
+            self.search_button.setEnabled(not busy)
+
+    def cancel_job(self):
+        self.workers.cancel("main")
+        self.extracted_text.setText("⏹ Cancelled.")
+
+    def closeEvent(self, event):
+        self.workers.shutdown()
+        if hasattr(self, "prefetcher"):
+            self.prefetcher.shutdown()
+        super().closeEvent(event)
+
     def extract_text_only(self):
         if hasattr(self, 'image_path'):
-            self.extracted_text.setText("Extracting text...")
-
-            QTimer.singleShot(1000, lambda: self.extracted_text.setText(self.extract_text(self.image_path)))
+            key = os.path.basename(self.image_path)
+            self.start_job(
+                core.extract, self.image_path, status="Extracting text...",
+                on_result=lambda text: self.show_doc(key, text),
+            )
         else:
             self.extracted_text.setText("⚠️ No image uploaded. Please upload an image first.")
 
     def summarize_text_only(self):
-        if self.extracted_text.toPlainText():
-            self.extracted_text.setText("Summarizing...")
-
-            QTimer.singleShot(1000, lambda: self.extracted_text.setText(self.summarize_text(self.extracted_text.toPlainText())))
+        text = self.extracted_text.toPlainText()
+        if text:
+            key = self.current_doc_key()
+            self.start_job(
+                core.summarize, text, key, status="Summarizing...",
+                on_result=lambda summary: self.show_doc(key, summary),
+            )
         else:
             self.extracted_text.setText("⚠️ No text available to summarize.")
     
@@ -244,20 +423,8 @@ class NewsApp(QMainWindow):
             self.extracted_text.setText("⚠️ No text available for sentiment analysis.")
             return
 
-        self.extracted_text.setText("Analyzing sentiment...")
-
-        def analyze_sentiment(text):
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity  # -1 (negative) to +1 (positive)
-
-            if polarity > 0:
-                return "😀 **Positive News** (Score: {:.2f})".format(polarity)
-            elif polarity < 0:
-                return "😠 **Negative News** (Score: {:.2f})".format(polarity)
-            else:
-                return "😐 **Neutral News** (Score: 0.00)"
+        self.start_job(core.sentiment, text, self.current_doc_key(), status="Analyzing sentiment...")
 
-        QTimer.singleShot(1000, lambda: self.extracted_text.setText(analyze_sentiment(text)))
     def init_live_news_tab(self):
         layout = QVBoxLayout()
 
@@ -273,13 +440,34 @@ class NewsApp(QMainWindow):
         # 📋 **List of News Headlines**
         self.news_list = QListWidget()
         self.news_list.itemClicked.connect(self.load_news_article)  # Click to summarize
+        self.news_list.verticalScrollBar().valueChanged.connect(self.prioritize_visible_news)
+
+        # 📥 **Download & parse listed articles in the background**
+        self.prefetcher = ArticlePrefetcher()
+
+        # 🗄 **Search the local archive (no network)**
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText('Search past articles, e.g. "air strike" kyiv')
+        self.search_input.returnPressed.connect(self.search_archive)
+        self.search_button = QPushButton("Search Archive")
+        self.search_button.clicked.connect(self.search_archive)
+        search_row = QHBoxLayout()
+        search_row.addWidget(self.search_input)
+        search_row.addWidget(self.search_button)
+
+        self.search_results = QListWidget()
+        self.search_results.itemClicked.connect(self.load_search_result)
+        self.search_results.hide()
 
         layout.addWidget(self.keyword_input)
         layout.addWidget(self.fetch_news_button)
         layout.addWidget(self.news_list)
+        layout.addLayout(search_row)
+        layout.addWidget(self.search_results)
         self.tab_live_news.setLayout(layout)
 
         self.news_data = []  # Store (headline, URL) pairs
+        self.search_hits = []
 
 
 
@@ -292,70 +480,84 @@ class NewsApp(QMainWindow):
         if not keyword:
             keyword = "war"  # Default keyword
 
-        self.news_data = fetch_live_news(keyword)  # Fetch news with keyword
+        self.workers.submit(
+            "live_news", core.live_news, keyword,
+            on_result=self.show_live_news,
+            on_error=lambda e: self.show_live_news([(f"⚠️ Error: {e}", None)]),
+        )
+
+    def show_live_news(self, news_data):
+        self.news_data = news_data
 
         self.news_list.clear()
         for headline, _ in self.news_data:
             self.news_list.addItem(headline)  # Display headlines
 
+        self.prefetcher.prefetch([url for _, url in self.news_data])
+        self.prioritize_visible_news()
 
+    def prioritize_visible_news(self, *_):
+        """Fetches the headlines currently on screen first."""
+        viewport = self.news_list.viewport()
+        first = self.news_list.indexAt(viewport.rect().topLeft()).row()
+        last = self.news_list.indexAt(viewport.rect().bottomLeft()).row()
+        if first < 0:
+            return
+        if last < 0:
+            last = len(self.news_data) - 1
+        self.prefetcher.prioritize([url for _, url in self.news_data[first:last + 1]])
 
     def load_news_article(self, item):
         
         index = self.news_list.row(item)
         if index >= len(self.news_data):  # Avoid crash
             return
-        _, article_url = self.news_data[index]
+        headline, article_url = self.news_data[index]
 
         if not article_url:
             self.extracted_text.setText("⚠️ Unable to load article.")
             return
 
-        self.extracted_text.setText("📄 Fetching article... Please wait.")
         self.tabs.setCurrentIndex(0)  # Switch to the main tab
+        self.start_job(
+            core.summarize_url, article_url, self.prefetcher.get, headline,
+            status="📄 Fetching article... Please wait.",
+            on_result=lambda summary: self.show_doc(article_url, summary),
+        )
+
+    def search_archive(self):
+        query = self.search_input.text().strip()
+        if not query:
+            self.search_results.hide()
+            return
+        self.workers.submit(
+            "search", core.search, query,
+            on_result=self.show_search_results,
+            on_error=lambda e: self.show_search_results([], f"⚠️ Search failed: {e}"),
+        )
+
+    def show_search_results(self, result, message=None):
+        hits, elapsed_ms = result if result else ([], 0)
+        self.search_hits = hits
+        self.search_results.clear()
+        self.search_results.addItem(message or f"🔍 {len(hits)} results ({elapsed_ms:.0f} ms)")
+        for hit in hits:
+            self.search_results.addItem(f"{hit.title or hit.key}\n   {hit.snippet}")
+        self.search_results.show()
+
+    def load_search_result(self, item):
+        index = self.search_results.row(item) - 1  # Row 0 is the result count
+        if not 0 <= index < len(self.search_hits):
+            return
+        hit = self.search_hits[index]
+        self.workers.submit("search", core.search_doc, hit.key, on_result=self.show_archived_doc)
 
-        QTimer.singleShot(1000, lambda: self.extract_text_from_url(article_url))  # Fetch article
-
-
-    def extract_text_from_url(self, url):
-        
-        try:
-            from newspaper import Article  # Lazy import to avoid unnecessary dependencies
-
-            article = Article(url)
-            article.download()
-            article.parse()
-
-            extracted_text = article.text[:3000]  # Limit text to avoid API overload
-            self.extracted_text.setText("📝 Summarizing with AI...")
-
-            QTimer.singleShot(1000, lambda: self.summarize_with_gemini(extracted_text))  # Summarize with Gemini
-
-        except Exception as e:
-            self.extracted_text.setText(f"⚠️ Error extracting article: {e}")
-    def summarize_with_gemini(self, text):
-        """
-        Summarizes the extracted article using Gemini AI.
-        """
-        try:
-            model = genai.GenerativeModel("gemini-1.5-flash")
-
-            prompt = f"""
-            You are an AI news assistant. Summarize this article in while keeping the key events.
-            - Keep it **concise & factual**.
-            - Retain **important details**.
-            - **Avoid opinions or unnecessary fluff**.
-
-            **Article:** {text}
-            """
-
-            response = model.generate_content(prompt)
-            summary = response.text.strip() if response.text else "⚠️ Summarization failed."
-
-            self.extracted_text.setText(summary)
-
-        except Exception as e:
-            self.extracted_text.setText(f"⚠️ Gemini AI Error: {e}")
+    def show_archived_doc(self, result):
+        key, doc = result
+        if not doc:
+            return
+        self.tabs.setCurrentIndex(0)
+        self.show_doc(key, doc["report"] or doc["summary"] or doc["article"])
 
     def init_settings_tab(self):
         layout = QVBoxLayout()
@@ -363,64 +565,175 @@ class NewsApp(QMainWindow):
         self.fact_check_button = QPushButton("Enable Fact-Checking (Coming Soon)")
         layout.addWidget(self.tts_settings_button)
         layout.addWidget(self.fact_check_button)
+
+        # ⏱️ **Performance panel**: recent stage timings, rates and counters
+        layout.addWidget(QLabel("⏱️ Performance"))
+        self.perf_view = QTextEdit()
+        self.perf_view.setReadOnly(True)
+        self.perf_view.setStyleSheet("font-family: monospace; font-size: 12px;")
+        layout.addWidget(self.perf_view)
+        perf_buttons = QHBoxLayout()
+        self.perf_export_button = QPushButton("Export Metrics")
+        self.perf_export_button.clicked.connect(self.export_metrics)
+        self.perf_reset_button = QPushButton("Reset")
+        self.perf_reset_button.clicked.connect(self.reset_metrics)
+        perf_buttons.addWidget(self.perf_export_button)
+        perf_buttons.addWidget(self.perf_reset_button)
+        layout.addLayout(perf_buttons)
         self.tab_settings.setLayout(layout)
 
+        from pipeline import metrics
+        if not metrics.METRICS_ENABLED:
+            self.perf_view.setText("Metrics are off (NEWS_METRICS=0).")
+            self.perf_export_button.setEnabled(False)
+            self.perf_reset_button.setEnabled(False)
+            return
+        self.perf_timer = QTimer(self)
+        self.perf_timer.timeout.connect(self.refresh_perf_panel)
+        self.perf_timer.start(1000)
+        self.refresh_perf_panel()
+
+    def refresh_perf_panel(self):
+        """Redraws the performance panel while the Settings tab is on screen."""
+        if self.tabs.currentWidget() is not self.tab_settings:
+            return
+        from pipeline import metrics
+
+        snapshot = metrics.get_metrics().snapshot()
+        lines = [f"{'stage':<20}{'runs':>6}{'err':>5}{'last ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'/min':>7}"]
+        for name, stage in sorted(snapshot["stages"].items()):
+            lines.append(
+                f"{name:<20}{stage['count']:>6}{stage['errors']:>5}{stage['last_ms']:>10.0f}"
+                f"{stage['p50_ms']:>10.0f}{stage['p95_ms']:>10.0f}{stage['per_minute']:>7.1f}"
+            )
+        if not snapshot["stages"]:
+            lines.append("(nothing timed yet)")
+        if snapshot["counters"]:
+            lines += ["", "counters"]
+            lines += [f"  {name:<28}{value:>14,.0f}" for name, value in sorted(snapshot["counters"].items())]
+        if snapshot["recent"]:
+            lines += ["", "latest"]
+            lines += [
+                f"  {event['ago']:>5.0f}s ago  {event['stage']:<20}{event['ms']:>9.0f} ms{'  ⚠️' if event['error'] else ''}"
+                for event in snapshot["recent"][:15]
+            ]
+        self.perf_view.setPlainText("\n".join(lines))
+
+    def export_metrics(self):
+        from pipeline import metrics
+
+        path, _ = QFileDialog.getSaveFileName(self, "Export Metrics", "metrics.prom", "Prometheus text (*.prom *.txt)")
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(metrics.get_metrics().prometheus())
+
+    def reset_metrics(self):
+        from pipeline import metrics
+
+        metrics.get_metrics().reset()
+        self.refresh_perf_panel()
+
     def upload_image(self):
         file_dialog = QFileDialog()
         filenames, _ = file_dialog.getOpenFileNames(self, "Select Image(s)", "", "Images (*.png *.jpg *.jpeg)")
         if filenames:
             self.image_path = filenames[0]  # Store the first image path
+            self.doc_key = None  # Set once the scan's text is shown
             self.extracted_text.setText("Image uploaded successfully! Click Process.")
 
     def process_image(self):
         if hasattr(self, 'image_path'):
-            self.process_button.setEnabled(False)
-            self.extracted_text.setText("Extracting text...")
-            QTimer.singleShot(1000, self.extract_step)
+            self._report_started = False
+            key = os.path.basename(self.image_path)
+            self.start_job(
+                core.report, self.image_path,
+                status="Extracting text...",
+                on_result=lambda _: self.show_doc(key),  # The report was streamed in
+                on_chunk=self.append_report_chunk,
+            )
         else:
             self.extracted_text.setText("No image uploaded. Please upload an image first.")
     
-    import random
-
     def update_avatar_animation(self, position):
-        """Randomly swaps avatar image between open and closed mouth for a more natural effect."""
-        # Introduce randomness in speed (faster/slower mouth movements)
-        change_speed = random.randint(200, 600)  # Change every 200ms to 600ms
-
-        # Randomize the opening-closing pattern
-        if position % change_speed < (change_speed // 2):  
-            self.avatar_label.setPixmap(self.avatar_open)
-        else:
-            self.avatar_label.setPixmap(self.avatar_closed)
+        """Opens the mouth while the audio is actually voiced (O(1) timeline lookup)."""
+        if self.current_timeline is not None:
+            self.set_mouth(self.current_timeline.is_open(position))
+        else:  # No decoder available: plain open/close rhythm
+            self.set_mouth((position // 150) % 2 == 0)
+
+    def set_mouth(self, is_open):
+        """Swaps the avatar pixmap only when the mouth state actually changes."""
+        if is_open == self.mouth_open:
+            return
+        self.mouth_open = is_open
+        if is_open and self.avatar_open is None:
+            self.avatar_open = QPixmap("assets/reporter/open.png")
+        self.avatar_label.setPixmap(self.avatar_open if is_open else self.avatar_closed)
 
     def play_news_audio(self):
         if self.extracted_text.toPlainText():
             self.audio_progress_bar.show()
             self.audio_progress_bar.setValue(0)
 
-            self.audio_thread = AudioThread(self.extracted_text.toPlainText(), AUDIO_OUTPUT)
+            player = self.ensure_media_player()
+            player.stop()
+            player.setSource(QUrl())  # Release the previous report's files
+            self.audio_queue = []
+            self.chunk_playing = False
+            self.report_audio = None
+            self.report_timeline = None
+
+            self.audio_thread = AudioThread(self.extracted_text.toPlainText(), self.audio_store, self.current_doc_key())
             self.audio_thread.progress.connect(self.audio_progress_bar.setValue)
+            self.audio_thread.chunk_ready.connect(self.audio_chunk_ready)
             self.audio_thread.finished.connect(self.audio_generation_complete)
+            self.audio_thread.error.connect(self.audio_generation_failed)
             self.audio_thread.start()
         else:
             self.extracted_text.setText("⚠️ No text available for audio conversion.")
 
-    def audio_generation_complete(self):
-        self.audio_progress_bar.setValue(100)
-        QTimer.singleShot(500, self.audio_progress_bar.hide)
-
-        # 🎵 **Load and Play Audio in App**
-        audio_url = QUrl.fromLocalFile(AUDIO_OUTPUT)
-        self.media_player.setSource(QUrl.fromLocalFile(AUDIO_OUTPUT))
-
+    def audio_chunk_ready(self, path, timeline):
+        if self.sender() is not self.audio_thread:  # Superseded by a newer report
+            return
+        self.audio_queue.append((path, timeline))
+        if not self.chunk_playing:
+            self.play_next_chunk()
+
+    def play_next_chunk(self):
+        """Plays the next synthesized chunk; returns False if none is ready yet."""
+        if not self.audio_queue:
+            self.chunk_playing = False
+            return False
+        self.chunk_playing = True
+        path, self.current_timeline = self.audio_queue.pop(0)
+        self.media_player.setSource(QUrl.fromLocalFile(os.path.abspath(path)))
         self.media_player.play()
 
         # 🔊 **Enable Slider**
         self.audio_slider.setEnabled(True)
+        return True
+
+    def on_media_status(self, status):
+        if status == self.media_player.MediaStatus.EndOfMedia:
+            if not self.play_next_chunk():
+                self.set_mouth(False)
+
+    def audio_generation_complete(self, report_path, timeline):
+        if self.sender() is not self.audio_thread:
+            return
+        self.report_timeline = timeline
+        self.audio_progress_bar.setValue(100)
+        QTimer.singleShot(500, self.audio_progress_bar.hide)
+        self.report_audio = report_path
+
+    def audio_generation_failed(self, message):
+        print(message)
+        self.audio_progress_bar.hide()
 
     # 🛠 **Audio Playback Functions**
     def set_audio_position(self, position):
-        self.media_player.setPosition(position)
+        if self.media_player:
+            self.media_player.setPosition(position)
 
     def update_slider(self, position):
         self.audio_slider.setValue(position)
@@ -429,61 +742,34 @@ class NewsApp(QMainWindow):
         self.audio_slider.setRange(0, duration)
 
     def play_audio(self):
+        self.ensure_media_player()
+        # ▶ After the chunks have played through, replay the whole report
+        if self.report_audio and not self.chunk_playing:
+            self.media_player.setSource(QUrl.fromLocalFile(os.path.abspath(self.report_audio)))
+            self.current_timeline = self.report_timeline
         self.media_player.play()
 
     def pause_audio(self):
-        self.media_player.pause()
+        if self.media_player:
+            self.media_player.pause()
+        self.set_mouth(False)
 
     def resume_audio(self):
-        self.media_player.play()
+        if self.media_player:
+            self.media_player.play()
 
     def stop_audio(self):
-        self.media_player.stop()
-    def extract_text(self, image_path):
-        """Extracts text from an image using Gemini API."""
-        try:
-            model = genai.GenerativeModel("gemini-1.5-flash")
-            processed_image = preprocess_image(image_path)
-            processed_pil = Image.fromarray(processed_image)
-            response = model.generate_content(["Extract the text from this newspaper article:", processed_pil])
-            return response.text.strip() if response.text else "Text extraction failed."
-        except Exception as e:
-            return f"Error: {e}"
-    def extract_step(self):
-        extracted_text = self.extract_text(self.image_path)
-        self.extracted_text.setText("Summarizing...")
-        QTimer.singleShot(1000, lambda: self.summarize_step(extracted_text))
-    
-    def summarize_step(self, extracted_text):
-        summary = self.summarize_text(extracted_text)
-        self.extracted_text.setText("Formatting news...")
-        QTimer.singleShot(1000, lambda: self.format_step(summary))
-    
-    def format_step(self, summary):
-        formatted_news = self.format_news(summary)
-        self.extracted_text.setText(formatted_news)
-        self.process_button.setEnabled(True)
-    def summarize_text(self, text):
-        """Summarizes the extracted text."""
-        try:
-            model = genai.GenerativeModel("gemini-1.5-flash")
-            response = model.generate_content(f"Summarize this news article:\n\n{text}")
-            return response.text.strip() if response.text else "Summarization failed."
-        except Exception as e:
-            return f"Error: {e}"
+        if self.media_player:
+            self.media_player.stop()
+        self.set_mouth(False)
+    def append_report_chunk(self, text):
+        """Streams report text into the main view as it arrives."""
+        if not self._report_started:
+            self._report_started = True
+            self.extracted_text.clear()
+        self.extracted_text.moveCursor(QTextCursor.MoveOperation.End)
+        self.extracted_text.insertPlainText(text)
 
-    def format_news(self, summary):
-        """Formats the summarized text into a news report."""
-        try:
-            model = genai.GenerativeModel("gemini-1.5-flash")
-            response = model.generate_content(f"""You are an AI wartime journalist. Convert the following summary into a professional news article.
-            - Use a **clear, neutral, and factual** journalistic tone.
-            - Keep sentences **concise** and paragraphs **short**.
-            - Highlight **key events first**, then **context**, then **expert opinions**.
-            - Make the **headline engaging yet factual**.\n\n{summary}""")
-            return response.text.strip() if response.text else "Formatting failed."
-        except Exception as e:
-            return f"Error: {e}"
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = NewsApp()
@@ -0,0 +1,154 @@
+"""
+Background download + parse of article pages with `newspaper`.
+
+As soon as headlines are listed, `ArticlePrefetcher` fetches their pages
+on a few worker threads, in list order, with whatever is currently on
+screen moved to the front. Parsed text lands in a size-bounded LRU cache,
+so clicking a headline usually finds its article already there.
+"""
+import itertools
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from pipeline import metrics
+
+PREFETCH_WORKERS = 4
+CACHE_MAX_CHARS = 5_000_000  # ~10 MB of article text
+REQUEST_TIMEOUT = 10
+
+
+def download_article_text(url):
+    """Downloads and parses one article page, returning its body text."""
+    from newspaper import Article  # Lazy import to avoid unnecessary dependencies
+
+    article = Article(url, request_timeout=REQUEST_TIMEOUT, fetch_images=False, memoize_articles=False)
+    with metrics.span("article.download"):
+        article.download()
+    metrics.count("article.downloaded_bytes", len(article.html or ""))
+    with metrics.span("article.parse"):
+        article.parse()
+    return article.text
+
+
+class ArticleCache:
+    """LRU cache of article text bounded by total characters."""
+
+    def __init__(self, max_chars=CACHE_MAX_CHARS):
+        self.max_chars = max_chars
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            text = self._items.get(url)
+            if text is not None:
+                self._items.move_to_end(url)
+            return text
+
+    def put(self, url, text):
+        with self._lock:
+            if url in self._items:
+                self._size -= len(self._items.pop(url))
+            self._items[url] = text
+            self._size += len(text)
+            while self._size > self.max_chars and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+
+class ArticlePrefetcher:
+    def __init__(self, workers=PREFETCH_WORKERS, cache=None, fetch=download_article_text):
+        self.cache = cache or ArticleCache()
+        self.fetch = fetch
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._boosts = itertools.count(1)
+        self._priority = {}  # url -> current (boost, rank) priority, lowest runs first
+        self._in_flight = {}  # url -> Future
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def prefetch(self, urls):
+        """Replaces the pending work with `urls`, fetched in the given order."""
+        with self._lock:
+            self._priority.clear()
+            for rank, url in enumerate(urls):
+                if url and url not in self._priority:
+                    self._enqueue(url, (0, rank))
+
+    def prioritize(self, urls):
+        """Moves `urls` (e.g. the rows currently on screen) ahead of everything else."""
+        with self._lock:
+            boost = -next(self._boosts)  # The latest call wins over earlier ones
+            for rank, url in enumerate(urls):
+                if url in self._priority:
+                    self._enqueue(url, (boost, rank))
+
+    def _enqueue(self, url, priority):
+        # Older queue entries for the same URL are skipped when popped
+        self._priority[url] = priority
+        self._queue.put((priority, next(self._order), url))
+
+    def get(self, url):
+        """
+        Returns the article text, waiting for an in-flight prefetch or
+        downloading it right here if it has not started yet.
+        """
+        text = self.cache.get(url)
+        if text is not None:
+            return text
+
+        with self._lock:
+            future = self._in_flight.get(url)
+            owner = future is None
+            if owner:
+                future = self._in_flight[url] = Future()
+                self._priority.pop(url, None)
+
+        if not owner:
+            try:
+                return future.result()
+            except Exception:
+                return self.get(url)  # The prefetch failed; try once more ourselves
+        return self._run(url, future)
+
+    def _run(self, url, future):
+        try:
+            text = self.fetch(url)
+            self.cache.put(url, text)
+            future.set_result(text)
+            return text
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(url, None)
+
+    def _work(self):
+        while True:
+            priority, _, url = self._queue.get()
+            if url is None:
+                return
+            with self._lock:
+                if self._priority.get(url) != priority or url in self._in_flight:
+                    continue  # Superseded, reprioritized or already being fetched
+                del self._priority[url]
+                if self.cache.get(url) is not None:
+                    continue
+                future = self._in_flight[url] = Future()
+            try:
+                self._run(url, future)
+            except Exception:
+                pass  # `get` retries on demand
+
+    def shutdown(self):
+        with self._lock:
+            self._priority.clear()
+        for _ in self._threads:
+            self._queue.put(((float("inf"),), next(self._order), None))
@@ -1,32 +1,135 @@
 import requests
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")  # Store your key in an environment variable
 NEWS_URL = "https://newsapi.org/v2/everything"  # ✅ Use "everything" for keyword filtering
+MAX_PAGE_SIZE = 100  # NewsAPI's limit per request
+REQUEST_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+CACHE_TTL = 120  # Seconds a response is served locally before asking NewsAPI again
+CACHE_MAX_ENTRIES = 256
 
-def fetch_live_news(query="war", page_size=5):
+
+class NewsAPIError(Exception):
+    pass
+
+
+def _make_session():
+    """One pooled, keep-alive session shared by every fetch (and thread)."""
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+SESSION = _make_session()
+_cache = {}  # (url, params) -> (expires_at, data)
+_cache_lock = threading.Lock()
+
+
+def _get_json(params):
+    """GETs NEWS_URL with `params`, serving repeats within CACHE_TTL from memory."""
+    key = (NEWS_URL, tuple(sorted(params.items())))
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+
+    response = SESSION.get(NEWS_URL, params={**params, "apiKey": NEWS_API_KEY}, timeout=REQUEST_TIMEOUT)
+    data = response.json()
+    if data.get("status") != "ok":
+        raise NewsAPIError(data.get("message", "Error fetching news."))
+
+    with _cache_lock:
+        if len(_cache) >= CACHE_MAX_ENTRIES:
+            for stale in [k for k, (expires_at, _) in _cache.items() if expires_at <= now] or [next(iter(_cache))]:
+                del _cache[stale]
+        _cache[key] = (now + CACHE_TTL, data)
+    return data
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def iter_article_pages(query="war", page_size=MAX_PAGE_SIZE, start_page=1, **params):
     """
-    Fetches live news articles based on a query.
-    Returns a list of (headline, URL) tuples.
+    Yields pages (lists of raw NewsAPI article dicts) starting at `start_page`
+    until the results run out. Pass the next page number back in as
+    `start_page` to resume from a cursor. An error on a later page (e.g. the
+    developer plan's 100-result cap) ends the listing; only an error on the
+    first page is raised.
     """
-    params = {
-        "q": query,  # ✅ Now works since we switched to "everything"
-        "language": "en",
-        "sortBy": "publishedAt",
-        "pageSize": page_size,
-        "apiKey": NEWS_API_KEY
-    }
+    page = start_page
+    while True:
+        try:
+            data = _get_json({
+                "q": query,
+                "language": "en",
+                "sortBy": "publishedAt",
+                "pageSize": page_size,
+                "page": page,
+                **params,
+            })
+        except NewsAPIError as e:
+            if page == start_page:
+                raise
+            print(f"⚠️ NewsAPI stopped at page {page}: {e}")
+            return
+        articles = data.get("articles", [])
+        if not articles:
+            return
+        yield articles
+        if page * page_size >= data.get("totalResults", 0):
+            return
+        page += 1
 
-    try:
-        response = requests.get(NEWS_URL, params=params)
-        data = response.json()
 
-        if data.get("status") != "ok":
-            return [("⚠️ Error fetching news.", None)]
+def fetch_articles(query="war", max_results=MAX_PAGE_SIZE, **params):
+    """Returns up to `max_results` raw article dicts, paging as needed."""
+    page_size = min(max_results, MAX_PAGE_SIZE)
+    articles = []
+    seen = set()
+    for page in iter_article_pages(query, page_size=page_size, **params):
+        for article in page:
+            if article.get("url") in seen:
+                continue
+            seen.add(article.get("url"))
+            articles.append(article)
+        if len(articles) >= max_results:
+            break
+    return articles[:max_results]
 
-        articles = data.get("articles", [])
-        news_data = [(f"📰 {article['title']}", article["url"]) for article in articles if article.get("title")]
 
+def to_headlines(articles):
+    return [(f"📰 {article['title']}", article["url"]) for article in articles if article.get("title")]
+
+
+def fetch_live_news(query="war", page_size=5):
+    """
+    Fetches live news articles based on a query.
+    Returns a list of (headline, URL) tuples.
+    """
+    try:
+        news_data = to_headlines(fetch_articles(query, max_results=page_size))
         return news_data if news_data else [("⚠️ No news found.", None)]
+    except NewsAPIError:
+        return [("⚠️ Error fetching news.", None)]
     except Exception as e:
         return [(f"⚠️ Error: {e}", None)]
+
+
+def fetch_many(queries, page_size=5, max_workers=4):
+    """Fetches several keywords concurrently. Returns {query: [(headline, URL), ...]}."""
+    queries = list(dict.fromkeys(queries))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(lambda q: fetch_live_news(q, page_size), queries)
+        return dict(zip(queries, results))
@@ -0,0 +1,177 @@
+"""
+Upload-size-aware preprocessing for OCR.
+
+`PreprocessEngine` turns a scan (path, encoded bytes or array) into a
+compact image for Gemini: decode straight to grayscale (at reduced size
+when possible), downscale to a target effective DPI, enhance with a
+reused CLAHE, optionally deskew and binarize, then re-encode under a byte
+budget. See benchmarks/preprocess_benchmark.py for size/quality numbers.
+"""
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from ocr_module.preprocess import get_clahe
+from pipeline import metrics
+from ocr_module.segment import segment_page
+
+TARGET_DPI = 200  # Plenty for body text; most scans come in at 300+
+DEFAULT_SOURCE_DPI = 300  # Assumed when the file carries no (or screen) DPI
+MAX_SIDE = 2400  # Long-side cap for screen captures and e-paper renders
+MAX_BYTES = 400 * 1024
+WEBP_QUALITIES = (80, 65, 50)
+WEBP_LOSSLESS = 101  # OpenCV's WebP quality above 100 means lossless
+LOSSLESS_MIN_FLAT = 0.55  # Share of pixels equal to their left neighbour for lossless to be worth trying
+MAX_DESKEW_ANGLE = 10.0
+
+EncodedImage = namedtuple("EncodedImage", "data mime_type width height")
+
+
+class PreprocessEngine:
+    def __init__(self, target_dpi=TARGET_DPI, max_side=MAX_SIDE, max_bytes=MAX_BYTES, binarize=False, deskew=True):
+        self.target_dpi = target_dpi
+        self.max_side = max_side
+        self.max_bytes = max_bytes
+        self.binarize = binarize
+        self.deskew = deskew
+
+    # 📥 **Decode**
+    def _scale_for(self, width, height, dpi):
+        scale = 1.0
+        if dpi and dpi >= 150:  # Screen DPIs (72/96/144) say nothing about print size
+            scale = min(scale, self.target_dpi / dpi)
+        elif not dpi:
+            scale = min(scale, self.target_dpi / DEFAULT_SOURCE_DPI) if max(width, height) > self.max_side else scale
+        return min(scale, self.max_side / max(width, height))
+
+    def load(self, source):
+        """Decodes a path, encoded bytes or array to a downscaled grayscale array."""
+        if isinstance(source, np.ndarray):
+            gray = source if source.ndim == 2 else cv2.cvtColor(source, cv2.COLOR_BGR2GRAY)
+            return self._resize(gray, self._scale_for(gray.shape[1], gray.shape[0], None))
+
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            gray = cv2.imdecode(np.frombuffer(source, np.uint8), cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                raise ValueError("Could not decode image bytes.")
+            return self._resize(gray, self._scale_for(gray.shape[1], gray.shape[0], None))
+
+        with Image.open(source) as header:  # Reads only the header
+            width, height = header.size
+            dpi = header.info.get("dpi", (None,))[0]
+        scale = self._scale_for(width, height, dpi)
+
+        # Let libjpeg/libpng decode at 1/2, 1/4 or 1/8 size when we'd throw the pixels away anyway
+        flag, reduced = cv2.IMREAD_GRAYSCALE, 1
+        for factor, reduced_flag in ((8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+                                     (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+                                     (2, cv2.IMREAD_REDUCED_GRAYSCALE_2)):
+            if scale <= 1 / factor:
+                flag, reduced = reduced_flag, factor
+                break
+        gray = cv2.imread(source, flag)
+        if gray is None:
+            raise ValueError(f"Could not read image: {source}")
+        return self._resize(gray, scale * reduced)
+
+    @staticmethod
+    def _resize(gray, scale):
+        if scale >= 0.99:
+            return gray
+        return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    # 🧹 **Clean up**
+    def prepare(self, source):
+        """Decoded, downscaled, contrast-enhanced (and optionally deskewed/binarized) array."""
+        with metrics.span("preprocess"):
+            enhanced = get_clahe().apply(self.load(source))
+            if self.deskew:
+                enhanced = deskew(enhanced)
+            if self.binarize:
+                enhanced = cv2.adaptiveThreshold(
+                    enhanced, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15
+                )
+            return enhanced
+
+    # 📤 **Encode**
+    @metrics.timed("encode")
+    def encode(self, image):
+        """
+        Encodes under `max_bytes`, shrinking if needed. The first round tries
+        WebP at the top quality alongside lossless WebP (for flat images such
+        as screenshots, which compress better losslessly) and PNG (for
+        binarized pages), and takes the smallest that fits. Lower qualities
+        are only tried when none of those fit.
+        """
+        lossless = self.binarize or np.mean(image[:, 1:] == image[:, :-1]) >= LOSSLESS_MIN_FLAT
+        while True:
+            rounds = [[(".webp", [cv2.IMWRITE_WEBP_QUALITY, WEBP_QUALITIES[0]], "image/webp")]]
+            if lossless:
+                rounds[0].append((".webp", [cv2.IMWRITE_WEBP_QUALITY, WEBP_LOSSLESS], "image/webp"))
+            if self.binarize:
+                rounds[0].append((".png", [cv2.IMWRITE_PNG_COMPRESSION, 9], "image/png"))
+            rounds += [[(".webp", [cv2.IMWRITE_WEBP_QUALITY, q], "image/webp")] for q in WEBP_QUALITIES[1:]]
+
+            smallest = None  # (buffer, mime type) of the smallest encoding that worked at all
+            for candidates in rounds:
+                fitting = None
+                for ext, params, mime_type in candidates:
+                    ok, buffer = cv2.imencode(ext, image, params)
+                    if not ok:
+                        continue
+                    if smallest is None or buffer.size < smallest[0].size:
+                        smallest = (buffer, mime_type)
+                    if buffer.size <= self.max_bytes and (fitting is None or buffer.size < fitting[0].size):
+                        fitting = (buffer, mime_type)
+                if fitting:
+                    return EncodedImage(fitting[0].tobytes(), fitting[1], image.shape[1], image.shape[0])
+            if max(image.shape) < 600:
+                if smallest is None:
+                    raise ValueError("Could not encode image.")
+                return EncodedImage(smallest[0].tobytes(), smallest[1], image.shape[1], image.shape[0])
+            image = cv2.resize(image, None, fx=0.8, fy=0.8, interpolation=cv2.INTER_AREA)
+
+    def process(self, source):
+        return self.encode(self.prepare(source))
+
+    def process_regions(self, source):
+        """One encoded crop per article block, in reading order (a single item for simple pages)."""
+        return self.encode_regions(self.prepare(source))
+
+    def encode_regions(self, prepared):
+        return [self.encode(region) for region in segment_page(prepared)]
+
+    def process_many(self, sources, max_workers=None):
+        """Processes several inputs concurrently (OpenCV releases the GIL)."""
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(self.process, sources))
+
+
+def deskew(gray):
+    """Rotates the page so text lines are horizontal (small angles only)."""
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    # Merge glyphs into line blobs, then take the dominant line angle
+    lines = cv2.morphologyEx(ink, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (25, 1)))
+    contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    angles = []
+    for contour in contours:
+        (_, _), (w, h), angle = cv2.minAreaRect(contour)
+        if max(w, h) < gray.shape[1] * 0.1:
+            continue
+        if w < h:
+            angle -= 90
+        angles.append(angle)
+    if not angles:
+        return gray
+    angle = float(np.median(angles))
+    if abs(angle) < 0.5 or abs(angle) > MAX_DESKEW_ANGLE:
+        return gray
+    h, w = gray.shape
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(gray, matrix, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+DEFAULT_ENGINE = PreprocessEngine()
@@ -1,10 +1,19 @@
 import cv2
 import numpy as np
+import threading
+
+_local = threading.local()
+
+def get_clahe():
+    """One CLAHE object per thread, reused across calls (cv2 objects are not thread-safe)."""
+    clahe = getattr(_local, "clahe", None)
+    if clahe is None:
+        clahe = _local.clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+    return clahe
 
 def preprocess_image(image_path):
     image = cv2.imread(image_path)
     gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-    enhanced = clahe.apply(gray)
+    enhanced = get_clahe().apply(gray)
 
     return enhanced
@@ -0,0 +1,224 @@
+"""
+Splits a newspaper page into article blocks in reading order.
+
+Only pages that really carry several articles are split: the page must be
+large, and it must have at least MIN_HEADLINES separate headlines (runs of
+letters several times the body text height). Clippings of one article,
+which are most scans, go whole in one request.
+
+Ink is smeared together with morphological dilation so words join into
+lines and lines into blocks, while the wider gutters between columns and
+the blank bands between articles keep blocks apart. Headline words are
+then joined into lines, stray fragments are folded into the nearest
+block, photo-only blocks are dropped, and blocks are ordered top to
+bottom by full-width band, then column by column within each band.
+"""
+import cv2
+import numpy as np
+
+MIN_BLOCK_FRAC = 0.01  # Smaller blocks (bylines, captions) are folded into a neighbour
+MIN_PAGE_SIDE = 900  # Pages smaller than this (after preprocessing) are sent whole
+MIN_HEADLINES = 3  # Fewer and the page is treated as one article
+HEADLINE_SCALE = 2.5  # Headline letters are at least this many times the median letter height
+HEADLINE_MIN_LETTERS = 8
+PHOTO_MIDTONE_FRAC = 0.35  # Text is mostly black on white; photos are mostly mid-grey
+MAX_REGIONS = 12  # More than this and per-request overhead outweighs the savings
+LINE_FRAC = 0.12  # Blocks shorter than this share of the page height are single lines
+WIDE_FRAC = 0.6  # Blocks wider than this share of the page span all columns
+PAD = 8
+
+
+def find_blocks(gray):
+    """Returns article block boxes (x, y, w, h), unordered."""
+    h, w = gray.shape
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+    # Column rules and separator lines would glue neighbouring articles together
+    rules = cv2.morphologyEx(ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (w // 8, 1)))
+    rules |= cv2.morphologyEx(ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, h // 8)))
+    ink = cv2.subtract(ink, rules)
+
+    # Kernel sizes scale with the page: join letters/words and neighbouring lines, not columns
+    join_words = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, w // 80), 1))
+    join_lines = cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(3, h // 60)))
+    blocks = cv2.dilate(cv2.dilate(ink, join_words), join_lines)
+
+    contours, _ = cv2.findContours(blocks, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = [cv2.boundingRect(c) for c in contours]
+    boxes = merge_overlapping(join_lines_of_text(boxes, h))
+    return merge_overlapping(absorb_small(boxes, MIN_BLOCK_FRAC * w * h))
+
+
+def _union(a, b):
+    x, y = min(a[0], b[0]), min(a[1], b[1])
+    return (x, y, max(a[0] + a[2], b[0] + b[2]) - x, max(a[1] + a[3], b[1] + b[3]) - y)
+
+
+def _merge_pairs(boxes, should_merge):
+    """Repeatedly unions any pair of boxes for which `should_merge(a, b)` holds."""
+    boxes = list(boxes)
+    i = 0
+    while i < len(boxes):
+        for j in range(len(boxes)):
+            if j != i and should_merge(boxes[i], boxes[j]):
+                boxes[i] = _union(boxes[i], boxes[j])
+                del boxes[j]
+                i = -1  # Start over: the grown box may now touch others
+                break
+        i += 1
+    return boxes
+
+
+def merge_overlapping(boxes, min_overlap=0.3):
+    """Unions boxes that overlap by more than `min_overlap` of the smaller one."""
+    def overlapping(a, b):
+        ix = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+        iy = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+        return ix > 0 and iy > 0 and ix * iy > min_overlap * min(a[2] * a[3], b[2] * b[3])
+    return _merge_pairs(boxes, overlapping)
+
+
+def join_lines_of_text(boxes, page_h):
+    """Joins side-by-side single-line boxes (e.g. headline words set in large type)."""
+    max_h = LINE_FRAC * page_h
+
+    def same_line(a, b):
+        if a[3] > max_h or b[3] > max_h:
+            return False
+        overlap = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+        gap = max(a[0], b[0]) - min(a[0] + a[2], b[0] + b[2])
+        return overlap > 0.6 * min(a[3], b[3]) and gap < min(a[3], b[3])
+    return _merge_pairs(boxes, same_line)
+
+
+def absorb_small(boxes, min_area):
+    """Folds blocks below `min_area` into the nearest large block so no text is dropped."""
+    large = [b for b in boxes if b[2] * b[3] >= min_area]
+    if not large:
+        return boxes
+    for box in (b for b in boxes if b[2] * b[3] < min_area):
+        cx, cy = box[0] + box[2] / 2, box[1] + box[3] / 2
+
+        def distance(b):
+            dx = max(b[0] - cx, 0, cx - (b[0] + b[2]))
+            dy = max(b[1] - cy, 0, cy - (b[1] + b[3]))
+            return dx * dx + dy * dy
+        nearest = min(range(len(large)), key=lambda i: distance(large[i]))
+        large[nearest] = _union(large[nearest], box)
+    return large
+
+
+def find_headlines(gray):
+    """Returns headline boxes (x, y, w, h): runs of letters much taller than the body text."""
+    h, w = gray.shape
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    xs, ys, ws, hs, areas = stats[1:].T
+    aspect = ws / np.maximum(hs, 1)
+    letters = (hs >= 4) & (aspect > 0.15) & (aspect < 2.5) & (hs < 0.1 * h)
+    if letters.sum() < 50:
+        return []
+    body = np.median(hs[letters])
+    fill = areas / np.maximum(ws * hs, 1)
+    big = letters & (hs >= HEADLINE_SCALE * body) & (fill > 0.15) & (fill < 0.9)
+
+    lines = []  # [x0, y0, x1, y1, letters]
+    for x, y, bw, bh in sorted(zip(xs[big], ys[big], ws[big], hs[big])):
+        for line in lines:
+            line_h = line[3] - line[1]
+            overlap = min(line[3], y + bh) - max(line[1], y)
+            if overlap > 0.5 * min(line_h, bh) and 0.5 < bh / line_h < 2 and x - line[2] < 1.2 * bh:
+                line[:4] = min(line[0], x), min(line[1], y), max(line[2], x + bw), max(line[3], y + bh)
+                line[4] += 1
+                break
+        else:
+            lines.append([x, y, x + bw, y + bh, 1])
+
+    # Stacked lines of one headline, and pieces that overlap or share a row, are one headline
+    def same_headline(a, b):
+        x_overlap = min(a[2], b[2]) - max(a[0], b[0])
+        y_overlap = min(a[3], b[3]) - max(a[1], b[1])
+        gap = max(a[1], b[1]) - min(a[3], b[3])
+        line_h = min(a[3] - a[1], b[3] - b[1])
+        return y_overlap > 0.5 * line_h or (x_overlap > 0 and gap < line_h)
+
+    headlines = []
+    for line in sorted((line for line in lines if line[4] >= 2), key=lambda line: line[1]):
+        for headline in headlines:
+            if same_headline(headline, line):
+                headline[:4] = (min(headline[0], line[0]), min(headline[1], line[1]),
+                                max(headline[2], line[2]), max(headline[3], line[3]))
+                headline[4] += line[4]
+                break
+        else:
+            headlines.append(list(line))
+    return [
+        (int(x0), int(y0), int(x1 - x0), int(y1 - y0)) for x0, y0, x1, y1, count in headlines
+        if count >= HEADLINE_MIN_LETTERS and x1 - x0 >= 0.1 * w
+    ]
+
+
+def is_photo(crop):
+    """True for picture-only blocks (mostly mid-grey), which carry no text worth a request."""
+    return np.count_nonzero((crop > 60) & (crop < 190)) > PHOTO_MIDTONE_FRAC * crop.size
+
+
+def _columns(boxes):
+    """Orders one band's boxes column by column (left to right), each top to bottom."""
+    columns = []  # [x0, x1, [boxes]]
+    for box in sorted(boxes, key=lambda b: b[0]):
+        x, _, w, _ = box
+        for column in columns:
+            overlap = min(column[1], x + w) - max(column[0], x)
+            if overlap > 0.5 * min(w, column[1] - column[0]):
+                column[0], column[1] = min(column[0], x), max(column[1], x + w)
+                column[2].append(box)
+                break
+        else:
+            columns.append([x, x + w, [box]])
+    ordered = []
+    for _, _, column_boxes in sorted(columns, key=lambda c: c[0]):
+        ordered.extend(sorted(column_boxes, key=lambda b: b[1]))
+    return ordered
+
+
+def reading_order(boxes, page_w):
+    """
+    Full-width blocks (headlines, banners) split the page into bands read
+    top to bottom. A column belongs to the band its middle falls in, so a
+    tall column starting beside a headline is read after that headline.
+    """
+    wide = sorted((b for b in boxes if b[2] >= WIDE_FRAC * page_w), key=lambda b: b[1])
+    bands = [[] for _ in range(len(wide) + 1)]
+    for box in boxes:
+        if box[2] < WIDE_FRAC * page_w:
+            middle = box[1] + box[3] / 2
+            bands[sum(1 for b in wide if b[1] + b[3] <= middle)].append(box)
+    ordered = _columns(bands[0])
+    for banner, band in zip(wide, bands[1:]):
+        ordered += [banner] + _columns(band)
+    return ordered
+
+
+def is_multi_article(gray):
+    h, w = gray.shape
+    return min(h, w) >= MIN_PAGE_SIDE and len(find_headlines(gray)) >= MIN_HEADLINES
+
+
+def segment_page(gray):
+    """
+    Returns crops of `gray` for each text block in reading order, or
+    `[gray]` for single-article pages and pages that don't split into a
+    sensible number of blocks.
+    """
+    h, w = gray.shape
+    if not is_multi_article(gray):
+        return [gray]
+    boxes = [(x, y, bw, bh) for x, y, bw, bh in find_blocks(gray) if not is_photo(gray[y:y + bh, x:x + bw])]
+    if not 2 <= len(boxes) <= MAX_REGIONS:
+        return [gray]
+    crops = []
+    for x, y, bw, bh in reading_order(boxes, w):
+        x0, y0 = max(0, x - PAD), max(0, y - PAD)
+        crops.append(np.ascontiguousarray(gray[y0:y + bh + PAD, x0:x + bw + PAD]))
+    return crops
@@ -0,0 +1,163 @@
+"""
+Headless batch mode: OCR → summarize → format every scan in a folder.
+
+    python -m pipeline.batch --images data/raw_images [--output data/news_extracted.csv]
+
+Preprocessing runs on a process pool, Gemini calls run on a bounded thread
+pool, and each finished image is appended to the article store (and the
+optional CSV) straight away, so an interrupted run picks up where it stopped. Near-duplicate scans and
+articles reuse earlier results (see pipeline.dedup), and every result is
+added to the local search index (see pipeline.search).
+"""
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from ocr_module.engine import DEFAULT_ENGINE
+from pipeline.gemini import extract_regions, summarize_text, format_news
+from pipeline.scheduler import BATCH
+from pipeline.dedup import get_index, phash
+from pipeline.search import get_search_index
+from pipeline.store import get_store
+
+IMAGES_DIR = os.path.join("data", "raw_images")
+FIELDNAMES = ["Image", "Article", "Summary", "Report"]
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def list_images(images_dir):
+    """Returns the image files in `images_dir`, sorted by name."""
+    return sorted(
+        os.path.join(images_dir, name)
+        for name in os.listdir(images_dir)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def load_finished(csv_path):
+    """
+    Returns the set of image names already present in `csv_path`.
+    Creates the file if missing and upgrades an older `Image,Article`
+    header in place so new rows can carry the summary and report.
+    """
+    if not os.path.exists(csv_path):
+        os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            csv.DictWriter(f, fieldnames=FIELDNAMES).writeheader()
+        return set()
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        header = reader.fieldnames or []
+        rows = list(reader)
+
+    if header != FIELDNAMES:
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES, restval="", extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+
+    return {row["Image"] for row in rows if row.get("Image")}
+
+
+def preprocess_and_hash(image_path):
+    """Runs in the process pool: encoded article-block crops plus the page's perceptual hash."""
+    prepared = DEFAULT_ENGINE.prepare(image_path)
+    return DEFAULT_ENGINE.encode_regions(prepared), phash(prepared)
+
+
+def process_one(cpu_pool, image_path):
+    """
+    Preprocesses on the process pool, then runs the three Gemini stages,
+    reusing whatever an earlier near-duplicate scan or article already produced.
+    """
+    name = os.path.basename(image_path)
+    index = get_index()
+    regions, image_hash = cpu_pool.submit(preprocess_and_hash, image_path).result()
+
+    previous = index.find_image(image_hash)
+    previous = previous.payload if previous and previous.payload else {}
+    article = previous.get("Article") or extract_regions(regions, priority=BATCH)
+
+    if not previous.get("Report"):
+        match = index.find_text(article)
+        previous = match.payload if match and match.payload else {}
+    summary = previous.get("Summary") or summarize_text(article, BATCH)  # Short ones share requests
+    report = previous.get("Report") or format_news(summary, BATCH)
+
+    payload = {"Article": article, "Summary": summary, "Report": report}
+    index.add_image(name, image_hash, payload)
+    index.add_text(name, article, payload)
+    get_search_index().add(name, article, summary, report, title=name)
+    get_store().append(name, image_hash=image_hash, title=name, article=article, summary=summary, report=report)
+    return {"Image": name, **payload}
+
+
+def run_batch(images_dir=IMAGES_DIR, output_csv=None, workers=None, model_workers=8, limit=None):
+    """
+    Processes every image in `images_dir` without a report in the article
+    store, also appending results to `output_csv` if given. Returns
+    (processed, failed) counts.
+
+    Each model worker holds at most one encoded image, so memory stays
+    bounded by `model_workers` regardless of the corpus size.
+    """
+    finished = get_store().keys("report")
+    if output_csv:
+        finished |= load_finished(output_csv)
+    pending = [p for p in list_images(images_dir) if os.path.basename(p) not in finished]
+    if limit:
+        pending = pending[:limit]
+
+    total = len(pending)
+    print(f"📂 {len(finished)} already done, {total} to process.")
+    if not total:
+        return 0, 0
+
+    processed = failed = 0
+    cpu_pool = ProcessPoolExecutor(max_workers=workers)
+    io_pool = ThreadPoolExecutor(max_workers=model_workers)
+    f = open(output_csv, "a", newline="", encoding="utf-8") if output_csv else None
+    try:
+        futures = {io_pool.submit(process_one, cpu_pool, path): path for path in pending}
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES) if f else None
+        for future in as_completed(futures):
+            name = os.path.basename(futures[future])
+            try:
+                row = future.result()  # Already in the article store
+            except Exception as e:
+                failed += 1
+                print(f"⚠️ [{processed + failed}/{total}] {name}: {e}")
+                continue
+            if writer:
+                writer.writerow(row)
+                f.flush()
+            processed += 1
+            print(f"✅ [{processed + failed}/{total}] {name}")
+    finally:
+        io_pool.shutdown(wait=True, cancel_futures=True)
+        cpu_pool.shutdown(wait=True, cancel_futures=True)
+        if f:
+            f.close()
+
+    return processed, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch OCR, summarize and format newspaper scans.")
+    parser.add_argument("--images", default=IMAGES_DIR, help="Folder of scans to process")
+    parser.add_argument("--output", default=None, help="Also append results to this CSV")
+    parser.add_argument("--workers", type=int, default=None, help="Preprocessing processes (default: CPU count)")
+    parser.add_argument("--model-workers", type=int, default=8, help="Concurrent Gemini requests")
+    parser.add_argument("--limit", type=int, default=None, help="Process at most N new images")
+    args = parser.parse_args(argv)
+
+    processed, failed = run_batch(args.images, args.output, args.workers, args.model_workers, args.limit)
+    print(f"🏁 Done: {processed} processed, {failed} failed (rerun to retry).")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
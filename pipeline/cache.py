@@ -0,0 +1,129 @@
+"""
+On-disk response cache for model calls.
+
+Entries are keyed by a SHA-256 of the model name, the prompt and the raw
+input bytes (encoded image upload or article text), stored in SQLite,
+evicted least-recently-used once the total size passes `max_bytes`, and
+treated as missing once older than `ttl` seconds. The total size is kept
+as a running count, so a write doesn't scan the table.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.path.join("data", "cache", "responses.sqlite3")
+CACHE_MAX_BYTES = 200 * 1024 * 1024  # 200 MB
+CACHE_TTL = 30 * 24 * 3600  # 30 days
+EVICT_EVERY = 256  # Puts between full passes (expired entries, running total re-synced)
+
+
+def cache_key(*parts):
+    """Hashes str/bytes parts into a stable hex key (parts are length-prefixed)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            part = b""
+        elif isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+        self._total = self._size_on_disk()
+        self._puts = 0
+
+    def _size_on_disk(self):
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        """Returns the cached value, or None on a miss or an expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, size, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, size, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total -= size
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return value
+
+    def put(self, key, value):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._total += size - (old[0] if old else 0)
+            self._puts += 1
+            if self._puts % EVICT_EVERY == 0:
+                self._expire()
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _expire(self):
+        """Drops expired entries and re-syncs the running total (other processes may share the file)."""
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        self._total = self._size_on_disk()
+
+    def _evict(self):
+        """Drops expired entries, then least-recently-used ones until under `max_bytes`."""
+        self._expire()
+        if self._total <= self.max_bytes:
+            return
+        excess = self._total - self.max_bytes
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            doomed.append((key,))
+            excess -= size
+            self._total -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._total = 0
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache():
+    """Returns the process-wide cache (created on first use)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
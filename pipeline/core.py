@@ -0,0 +1,241 @@
+"""
+GUI-free news pipeline shared by the desktop app and the HTTP service.
+
+Every step is a plain function `step(job, ...)`. `job` reports progress and
+streamed text and lets the caller cancel: the GUI passes its worker
+(gui.workers.Worker), headless callers pass a `Job()` (or nothing). Results
+are recorded in the dedup index, search index and article store as they
+are produced. Model calls default to interactive priority; background
+callers pass `priority=BATCH` (see pipeline.scheduler). Each step is timed
+as a "step.*" span (see pipeline.metrics). Heavy modules are imported on
+first use.
+"""
+import hashlib
+import os
+import time
+
+from pipeline import metrics
+from pipeline.scheduler import INTERACTIVE
+
+
+class Job:
+    """Do-nothing progress sink for headless callers; subclass to observe a step."""
+
+    cancelled = False
+
+    def check(self):
+        pass
+
+    def progress(self, value):
+        pass
+
+    def chunk(self, text):
+        pass
+
+    def status(self, text):
+        pass
+
+
+NO_JOB = Job()
+
+
+def image_name(image):
+    """Store key of a scan: its file name, or a content hash for uploaded bytes."""
+    if isinstance(image, str):
+        return os.path.basename(image)
+    return "upload-" + hashlib.sha1(bytes(image)).hexdigest()[:16] + ".jpg"
+
+
+@metrics.timed("step.report")
+def report(job=NO_JOB, image=None, name=None, priority=INTERACTIVE):
+    """
+    Turns a scan (path or encoded bytes) into a news report, streaming the
+    text through `job.chunk` as it is written. Returns the full report.
+    """
+    from ocr_module.engine import DEFAULT_ENGINE
+    from pipeline import gemini, dedup
+    from pipeline.search import get_search_index
+    from pipeline.store import get_store
+
+    name = name or image_name(image)
+    prepared = DEFAULT_ENGINE.prepare(image)
+    image_hash = dedup.phash(prepared)
+    job.progress(30)
+
+    match = dedup.get_index().find_image(image_hash)
+    if match and match.payload and match.payload.get("Report"):
+        job.chunk(match.payload["Report"])  # ♻️ Same scan as before
+        job.progress(100)
+        return match.payload["Report"]
+
+    regions = DEFAULT_ENGINE.encode_regions(prepared)
+    if len(regions) == 1:
+        stream = gemini.stream_report(regions[0], priority)
+        page_text = None
+    else:  # 📰 Multi-article page: extract the blocks in parallel, then write them up
+        job.status(f"Extracting {len(regions)} article blocks...")
+        page_text = gemini.extract_regions(regions, priority=priority)
+        job.check()
+        job.progress(60)
+        stream = gemini.stream_report_from_text(page_text, priority)
+
+    parts = []
+    for text in stream:
+        job.check()
+        job.chunk(text)
+        parts.append(text)
+    payload = dict(match.payload or {}) if match else {}
+    payload["Report"] = "".join(parts).strip()
+    dedup.get_index().add_image(name, image_hash, payload)
+    get_search_index().add(name, page_text, report=payload["Report"], title=name)
+    get_store().append(name, image_hash=image_hash, title=name, article=page_text, report=payload["Report"])
+    job.progress(100)
+    return payload["Report"]
+
+
+@metrics.timed("step.extract")
+def extract(job=NO_JOB, image=None, name=None, priority=INTERACTIVE):
+    """OCR only: the raw text of a scan (path or encoded bytes)."""
+    from ocr_module.engine import DEFAULT_ENGINE
+    from pipeline import gemini
+    from pipeline.search import get_search_index
+    from pipeline.store import get_store
+
+    name = name or image_name(image)
+    regions = DEFAULT_ENGINE.process_regions(image)
+    job.progress(40)
+    job.check()
+    text = gemini.extract_regions(regions, priority=priority)
+    get_search_index().add(name, text, title=name)
+    get_store().append(name, title=name, article=text)
+    job.progress(100)
+    return text
+
+
+@metrics.timed("step.summarize")
+def summarize(job=NO_JOB, text="", doc_key=None, priority=INTERACTIVE):
+    from pipeline import gemini
+    from pipeline.search import get_search_index
+    from pipeline.store import get_store
+
+    summary = gemini.summarize_text(text, priority)
+    if doc_key:  # Summary of a scan or article already in the store
+        get_search_index().add(doc_key, summary=summary)
+        get_store().append(doc_key, summary=summary)
+    job.progress(100)
+    return summary
+
+
+@metrics.timed("step.format")
+def format_report(job=NO_JOB, text="", doc_key=None, priority=INTERACTIVE):
+    """Writes a summary up as a news report."""
+    from pipeline import gemini
+    from pipeline.search import get_search_index
+    from pipeline.store import get_store
+
+    formatted = gemini.format_news(text, priority)
+    if doc_key:
+        get_search_index().add(doc_key, report=formatted)
+        get_store().append(doc_key, report=formatted)
+    job.progress(100)
+    return formatted
+
+
+@metrics.timed("step.sentiment")
+def sentiment_score(job=NO_JOB, text="", doc_key=None):
+    """Returns {"polarity", "subjectivity", "verdict"} for the text."""
+    from sentiment import analyzer as sentiment_analyzer
+    from pipeline.store import get_store
+
+    verdict = sentiment_analyzer.describe(text)
+    score = sentiment_analyzer.score_text(text)  # Cached by describe()
+    result = {"polarity": score.polarity, "subjectivity": score.subjectivity}
+    if doc_key:
+        get_store().append(doc_key, sentiment=result)
+    job.progress(100)
+    return {**result, "verdict": verdict}
+
+
+def sentiment(job=NO_JOB, text="", doc_key=None):
+    """Human-readable sentiment verdict (for the GUI)."""
+    return sentiment_score(job, text, doc_key)["verdict"]
+
+
+@metrics.timed("step.summarize_url")
+def summarize_url(job=NO_JOB, url="", fetch=None, title=None, priority=INTERACTIVE):
+    """Downloads (or takes the prefetched text of) a web article and summarizes it."""
+    from pipeline import gemini, dedup
+    from pipeline.search import get_search_index
+    from pipeline.store import get_store
+
+    if fetch is None:
+        from news.article_fetcher import download_article_text as fetch
+
+    article_text = fetch(url)
+    job.progress(60)
+    job.check()
+
+    # An earlier version of this same URL may have been edited since; summarizing it again is cheap,
+    # as unchanged sections come from the cache
+    match = dedup.get_index().find_text(article_text)
+    if match and match.key != url and match.payload and match.payload.get("Summary"):
+        get_search_index().add(url, article_text, match.payload["Summary"], title=title, url=url)
+        get_store().append(url, url=url, title=title, article=article_text, summary=match.payload["Summary"])
+        job.progress(100)
+        return match.payload["Summary"]  # ♻️ Same wire story as an earlier article
+
+    job.status("📝 Summarizing with AI...")
+    summary = gemini.summarize_article(article_text, priority)  # Whole article, section by section if long
+    dedup.get_index().add_text(url, article_text, {"Summary": summary})
+    get_search_index().add(url, article_text, summary, title=title, url=url)
+    get_store().append(url, url=url, title=title, article=article_text, summary=summary)
+    job.progress(100)
+    return summary
+
+
+@metrics.timed("step.speech")
+def speech(job=NO_JOB, text="", store=None, doc_key=None):
+    """Synthesizes the whole text and returns the path of its MP3 (cached per text)."""
+    from tts.audio_cache import AudioStore
+    from tts.text_to_speech import generate_speech_chunks, report_audio_path, store_report_audio
+    from pipeline.store import get_store
+
+    store = store or AudioStore()
+    path = report_audio_path(text, store)
+    if not path:
+        chunk_paths = []
+        for chunk_path in generate_speech_chunks(
+            text, store, progress=lambda done, total: job.progress(done * 100 // total),
+        ):
+            job.check()
+            chunk_paths.append(chunk_path)
+        if not chunk_paths:
+            raise ValueError("Nothing to read out.")
+        path = store_report_audio(text, chunk_paths, store)
+    if doc_key:
+        get_store().append(doc_key, audio=path)
+    job.progress(100)
+    return path
+
+
+@metrics.timed("step.live_news")
+def live_news(job=NO_JOB, keyword="war"):
+    from news.live_news_api import fetch_live_news
+
+    return fetch_live_news(keyword)
+
+
+@metrics.timed("step.search")
+def search(job=NO_JOB, query=""):
+    """Returns (hits, elapsed milliseconds) from the local archive."""
+    from pipeline.search import get_search_index
+
+    start = time.perf_counter()
+    hits = get_search_index().search(query)
+    return hits, (time.perf_counter() - start) * 1000
+
+
+def search_doc(job=NO_JOB, key=""):
+    from pipeline.search import get_search_index
+
+    return key, get_search_index().get(key)
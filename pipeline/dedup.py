@@ -0,0 +1,209 @@
+"""
+Near-duplicate index for articles and scans.
+
+Text is fingerprinted with MinHash over word shingles and images with a
+64-bit DCT perceptual hash. Both are split into bands stored in indexed
+SQLite tables (locality-sensitive hashing), so a lookup only touches the
+few documents sharing a band with the query instead of scanning the whole
+corpus. Each document can carry a JSON payload (e.g. its summary) that a
+later duplicate reuses instead of going back to Gemini.
+
+    python -m pipeline.dedup --import data/news_extracted.csv
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+DEDUP_PATH = os.path.join("data", "cache", "dedup.sqlite3")
+SHINGLE_WORDS = 5
+NUM_PERM = 128
+BANDS = 16  # 8 rows per band: pairs above ~0.7 Jaccard almost always collide
+TEXT_THRESHOLD = 0.7  # Estimated Jaccard similarity to count as the same story
+IMAGE_BAND_BITS = (11, 11, 11, 11, 10, 10)  # Any pair within 5 bits shares a band
+IMAGE_MAX_DISTANCE = 5  # Hamming distance between perceptual hashes
+
+_MERSENNE = (1 << 61) - 1
+_rng = np.random.default_rng(20250102)
+_PERM_A = _rng.integers(1, 1 << 31, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, NUM_PERM, dtype=np.uint64)
+_WORD = re.compile(r"\w+")
+
+Match = namedtuple("Match", "key score payload")
+
+
+def minhash(text):
+    """MinHash signature (NUM_PERM uint32 values) of the text's word shingles."""
+    words = _WORD.findall(text.lower())
+    if not words:
+        return None
+    k = min(SHINGLE_WORDS, len(words))
+    shingles = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # (a * x + b) mod p fits in uint64: a, b < 2^31 and x < 2^32
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def phash(image):
+    """64-bit perceptual hash of a grayscale (or BGR) image array."""
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()[1:]  # Drop the DC term
+    bits = low > np.median(low)
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def _text_bands(signature):
+    rows = NUM_PERM // BANDS
+    return [zlib.crc32(signature[i * rows:(i + 1) * rows].tobytes()) for i in range(BANDS)]
+
+
+def _image_bands(value):
+    bands = []
+    shift = 0
+    for bits in IMAGE_BAND_BITS:
+        bands.append((value >> shift) & ((1 << bits) - 1))
+        shift += bits
+    return bands
+
+
+class DuplicateIndex:
+    def __init__(self, path=DEDUP_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                payload TEXT,
+                UNIQUE (kind, key)
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                kind TEXT NOT NULL,
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                doc_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS bands_lookup ON bands (kind, band, value);
+            """
+        )
+
+    # 📝 **Text**
+    def add_text(self, key, text, payload=None):
+        signature = minhash(text)
+        if signature is not None:
+            self._add("text", key, signature.tobytes(), _text_bands(signature), payload)
+
+    def find_text(self, text):
+        """Returns the most similar indexed text as a Match(key, similarity, payload), or None."""
+        signature = minhash(text)
+        if signature is None:
+            return None
+        best = None
+        for key, blob, payload in self._candidates("text", _text_bands(signature)):
+            similarity = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == signature))
+            if similarity >= TEXT_THRESHOLD and (best is None or similarity > best.score):
+                best = Match(key, similarity, payload)
+        return best
+
+    # 🖼 **Images**
+    def add_image(self, key, image_hash, payload=None):
+        self._add("image", key, image_hash.to_bytes(8, "big"), _image_bands(image_hash), payload)
+
+    def find_image(self, image_hash):
+        """Returns the closest indexed image as a Match(key, hamming distance, payload), or None."""
+        best = None
+        for key, blob, payload in self._candidates("image", _image_bands(image_hash)):
+            distance = bin(int.from_bytes(blob, "big") ^ image_hash).count("1")
+            if distance <= IMAGE_MAX_DISTANCE and (best is None or distance < best.score):
+                best = Match(key, distance, payload)
+        return best
+
+    def set_payload(self, kind, key, payload):
+        with self._lock:
+            self._conn.execute("UPDATE docs SET payload = ? WHERE kind = ? AND key = ?", (json.dumps(payload), kind, key))
+
+    def _add(self, kind, key, signature, bands, payload):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute("SELECT id FROM docs WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+                if row:
+                    self._conn.execute("DELETE FROM bands WHERE doc_id = ?", (row[0],))
+                    self._conn.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+                doc_id = self._conn.execute(
+                    "INSERT INTO docs (kind, key, signature, payload) VALUES (?, ?, ?, ?)",
+                    (kind, key, signature, json.dumps(payload) if payload is not None else None),
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO bands (kind, band, value, doc_id) VALUES (?, ?, ?, ?)",
+                    [(kind, band, value, doc_id) for band, value in enumerate(bands)],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _candidates(self, kind, bands):
+        """Documents sharing at least one band with the query (the LSH step)."""
+        where = " OR ".join("(band = ? AND value = ?)" for _ in bands)
+        params = [kind] + [x for pair in enumerate(bands) for x in pair]
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT key, signature, payload FROM docs WHERE id IN (
+                        SELECT doc_id FROM bands WHERE kind = ? AND ({where}))""",
+                params,
+            ).fetchall()
+        return [(key, blob, json.loads(payload) if payload else None) for key, blob, payload in rows]
+
+    def import_csv(self, csv_path, images_dir=None):
+        """Indexes the Article column of `csv_path` (and the scans it names, if found)."""
+        from ocr_module.engine import DEFAULT_ENGINE
+
+        count = 0
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                payload = {k: v for k, v in row.items() if k != "Image" and v}
+                if row.get("Article"):
+                    self.add_text(row["Image"], row["Article"], payload)
+                    count += 1
+                image_path = os.path.join(images_dir, row["Image"]) if images_dir else None
+                if image_path and os.path.exists(image_path):
+                    self.add_image(row["Image"], phash(DEFAULT_ENGINE.prepare(image_path)), payload)
+        return count
+
+
+_default_index = None
+_default_lock = threading.Lock()
+
+
+def get_index():
+    """Returns the process-wide duplicate index (opened on first use)."""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = DuplicateIndex()
+        return _default_index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the near-duplicate index.")
+    parser.add_argument("--import", dest="csv_path", default=os.path.join("data", "news_extracted.csv"))
+    parser.add_argument("--images", default=os.path.join("data", "raw_images"))
+    args = parser.parse_args()
+    print(f"✅ Indexed {get_index().import_csv(args.csv_path, args.images)} articles.")
@@ -0,0 +1,440 @@
+import os
+import queue
+import re
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pipeline import metrics
+from pipeline.cache import cache_key, get_cache
+from pipeline.scheduler import BATCH, INTERACTIVE, Batcher, ModelError, get_scheduler
+from pipeline.stub import STUB_BACKEND, StubModel
+
+MODEL_NAME = "gemini-1.5-flash"
+CACHE_MODEL = f"stub:{MODEL_NAME}" if STUB_BACKEND else MODEL_NAME  # Never mix stub and real responses
+REGION_WORKERS = 6  # Article blocks of one page extracted concurrently
+PACK_MAX_CHARS = 2000  # Batch summaries of articles up to this long may share one request
+PACK_MAX_ARTICLES = 5
+PACK_TOTAL_CHARS = 8000
+ARTICLE_SINGLE_CHARS = 3000  # Longer articles are summarized section by section, then merged
+CHUNK_MIN_CHARS = 1500
+CHUNK_MAX_CHARS = 4000
+CHUNK_BOUNDARY_ODDS = 3  # Past the minimum, about 1 paragraph in 3 closes a section
+CHUNK_WORKERS = 8  # Matches the scheduler's default concurrency
+SECTION_MAX_CHARS = 32000  # Sections grow up to this so one article fits in the token bucket's burst
+MERGE_MAX_CHARS = 8000  # Section summaries merged per request
+
+EXTRACT_PROMPT = "Extract the text from this newspaper article:"
+SUMMARIZE_PROMPT = "Summarize this news article:\n\n{text}"
+FORMAT_PROMPT = """You are an AI wartime journalist. Convert the following summary into a professional news article.
+            - Use a **clear, neutral, and factual** journalistic tone.
+            - Keep sentences **concise** and paragraphs **short**.
+            - Highlight **key events first**, then **context**, then **expert opinions**.
+            - Make the **headline engaging yet factual**.\n\n{summary}"""
+REPORT_PROMPT = """You are an AI wartime journalist. Read the newspaper article in this image and write it up as a professional news report.
+            - Use only facts that appear in the article.
+            - Use a **clear, neutral, and factual** journalistic tone.
+            - Keep sentences **concise** and paragraphs **short**.
+            - Highlight **key events first**, then **context**, then **expert opinions**.
+            - Make the **headline engaging yet factual**.
+            Reply with the report only."""
+REPORT_FROM_TEXT_PROMPT = """You are an AI wartime journalist. Write the following newspaper text up as a professional news report.
+            - Use only facts that appear in the text.
+            - Use a **clear, neutral, and factual** journalistic tone.
+            - Keep sentences **concise** and paragraphs **short**.
+            - Highlight **key events first**, then **context**, then **expert opinions**.
+            - Make the **headline engaging yet factual**.
+            Reply with the report only.\n\n{text}"""
+ARTICLE_PROMPT = """
+            You are an AI news assistant. Summarize this article in while keeping the key events.
+            - Keep it **concise & factual**.
+            - Retain **important details**.
+            - **Avoid opinions or unnecessary fluff**.
+
+            **Article:** {text}
+            """
+SECTION_PROMPT = """
+            You are an AI news assistant. Summarize this section of a longer news article.
+            - Keep every **key event, name, number and date**.
+            - Keep it **concise & factual**.
+            - **Avoid opinions or unnecessary fluff**.
+            Reply with the summary only.
+
+            **Section:** {text}
+            """
+MERGE_PROMPT = """
+            You are an AI news assistant. Below are summaries of consecutive sections of one article, in order.
+            Merge them into a single summary of the whole article while keeping the key events.
+            - Keep it **concise & factual**.
+            - Retain **important details** and drop repetition.
+            - **Avoid opinions or unnecessary fluff**.
+
+            **Section summaries:**
+            {text}
+            """
+PACKED_SUMMARIZE_PROMPT = """Summarize each of the following {count} news articles separately.
+            Reply with exactly {count} summaries, each starting on its own line with its marker
+            (=== SUMMARY 1 ===, === SUMMARY 2 ===, ...), in the same order as the articles.
+
+{articles}"""
+_PACKED_MARKER = re.compile(r"^=+\s*SUMMARY\s+(\d+)\s*=+\s*$", re.MULTILINE)
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_model(name=MODEL_NAME):
+    """One shared GenerativeModel per model name, created on first use."""
+    with _models_lock:
+        model = _models.get(name)
+        if model is None and STUB_BACKEND:
+            model = _models[name] = StubModel(name)
+        elif model is None:
+            import google.generativeai as genai  # Slow to import (gRPC/protobuf); only load when needed
+
+            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+            model = _models[name] = genai.GenerativeModel(name)
+        return model
+
+
+def _response_text(response):
+    try:
+        return response.text or ""
+    except ValueError:  # No text parts (e.g. blocked by safety filters)
+        return ""
+
+
+def _request(content, priority):
+    """
+    Sends one request through the shared scheduler (rate limit, retries,
+    priority). The "model" span includes queueing and retries; "gemini" is
+    each attempt on its own.
+    """
+    def attempt():
+        with metrics.span("gemini"):
+            return get_model().generate_content(content())
+
+    with metrics.span("model"):
+        return get_scheduler().call(attempt, priority)
+
+
+def _count_usage(payload, response):
+    """Counts what a cache miss cost: bytes sent and, when the SDK reports them, tokens."""
+    metrics.count("model.cache_misses")
+    metrics.count("model.upload_bytes", len(payload) if isinstance(payload, bytes) else len(payload.encode("utf-8")))
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        metrics.count("model.prompt_tokens", getattr(usage, "prompt_token_count", 0) or 0)
+        metrics.count("model.output_tokens", getattr(usage, "candidates_token_count", 0) or 0)
+
+
+def _generate(prompt, content, payload, failure, priority=INTERACTIVE):
+    """
+    Builds the request with `content()` and sends it to the model, unless a
+    response for the same model, prompt and input bytes is already cached.
+    Raises ModelError(failure) on an empty answer; failures are not cached.
+    """
+    cache = get_cache()
+    key = cache_key(CACHE_MODEL, prompt, payload)
+    cached = cache.get(key)
+    if cached is not None:
+        metrics.count("model.cache_hits")
+        return cached
+
+    response = _request(content, priority)
+    _count_usage(payload, response)
+    text = _response_text(response).strip()
+    if not text:
+        raise ModelError(failure)
+    cache.put(key, text)
+    return text
+
+
+def encode_image(image):
+    """Compact upload for a path, array or already encoded image."""
+    from ocr_module.engine import DEFAULT_ENGINE, EncodedImage
+
+    if isinstance(image, EncodedImage):
+        return image
+    if isinstance(image, str):
+        return DEFAULT_ENGINE.process(image)
+    return DEFAULT_ENGINE.encode(image)
+
+
+def _image_part(encoded):
+    return {"mime_type": encoded.mime_type, "data": encoded.data}
+
+
+def extract_text_from_image(image, priority=INTERACTIVE):
+    """Extracts text from a scan (path, preprocessed array or EncodedImage)."""
+    encoded = encode_image(image)
+    return _generate(
+        EXTRACT_PROMPT,
+        lambda: [EXTRACT_PROMPT, _image_part(encoded)],
+        encoded.data,
+        "Text extraction failed.",
+        priority,
+    )
+
+
+def extract_regions(regions, max_workers=REGION_WORKERS, priority=INTERACTIVE):
+    """Extracts each article block concurrently and joins the text in reading order."""
+    if len(regions) == 1:
+        return extract_text_from_image(regions[0], priority)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return "\n\n".join(pool.map(lambda region: extract_text_from_image(region, priority), regions))
+
+
+def extract_text(image_path):
+    """Extracts text from an image using Gemini API, one request per article block."""
+    from ocr_module.engine import DEFAULT_ENGINE
+
+    return extract_regions(DEFAULT_ENGINE.process_regions(image_path))
+
+
+def summarize_text(text, priority=INTERACTIVE):
+    """
+    Summarizes the extracted text. Short texts summarized at BATCH priority
+    may be packed with others into one request (see `_summarize_packed`).
+    """
+    if priority == BATCH and len(text) <= PACK_MAX_CHARS:
+        cached = get_cache().get(cache_key(CACHE_MODEL, SUMMARIZE_PROMPT, text))
+        if cached is not None:
+            metrics.count("model.cache_hits")
+            return cached
+        return _summary_batcher.submit(text).result()
+    return _summarize_one(text, priority)
+
+
+def _summarize_one(text, priority):
+    return _generate(
+        SUMMARIZE_PROMPT, lambda: SUMMARIZE_PROMPT.format(text=text), text, "Summarization failed.", priority
+    )
+
+
+def _summarize_packed(texts):
+    """
+    One request summarizing several short articles. Each summary is cached
+    as if summarized alone; if the reply can't be split cleanly, the
+    articles are summarized one by one instead.
+    """
+    if len(texts) == 1:
+        return [_summarize_one(texts[0], BATCH)]
+    articles = "\n\n".join(f"=== ARTICLE {i} ===\n{text}" for i, text in enumerate(texts, 1))
+    prompt = PACKED_SUMMARIZE_PROMPT.format(count=len(texts), articles=articles)
+    response = _request(lambda: prompt, BATCH)
+    _count_usage(prompt, response)
+    metrics.count("model.packed_requests")
+    reply = _response_text(response)
+
+    pieces = _PACKED_MARKER.split(reply)[1:]  # [number, text, number, text, ...]
+    summaries = {int(n): body.strip() for n, body in zip(pieces[::2], pieces[1::2])}
+    if sorted(summaries) != list(range(1, len(texts) + 1)) or not all(summaries.values()):
+        print(f"⚠️ Packed summary of {len(texts)} articles didn't split cleanly; summarizing them one by one.")
+        with ThreadPoolExecutor(max_workers=len(texts)) as pool:
+            return list(pool.map(lambda text: _summarize_one(text, BATCH), texts))
+
+    cache = get_cache()
+    for i, text in enumerate(texts, 1):
+        cache.put(cache_key(CACHE_MODEL, SUMMARIZE_PROMPT, text), summaries[i])
+    return [summaries[i] for i in range(1, len(texts) + 1)]
+
+
+_summary_batcher = Batcher(_summarize_packed, max_items=PACK_MAX_ARTICLES, max_chars=PACK_TOTAL_CHARS)
+
+
+def format_news(summary, priority=INTERACTIVE):
+    """Formats the summarized text into a news report."""
+    return _generate(
+        FORMAT_PROMPT, lambda: FORMAT_PROMPT.format(summary=summary), summary, "Formatting failed.", priority
+    )
+
+
+def summarize_article(text, priority=INTERACTIVE):
+    """
+    Summarizes a web article (used for Live News) in one request, unless
+    it is longer than ARTICLE_SINGLE_CHARS and splits into several
+    sections. Those are map-reduced: the sections are summarized
+    concurrently and the partial summaries merged. Sections are made
+    larger until they and the merge fit in the scheduler's burst, so with
+    saved-up tokens the whole piece costs about two requests' latency rather
+    than one token interval per section. Section summaries are cached on
+    their own, so an updated article only re-summarizes the sections that
+    changed.
+    """
+    sections = [text]
+    if len(text) > ARTICLE_SINGLE_CHARS:
+        sections = article_sections(text, max(1, int(get_scheduler().bucket.capacity) - 1))
+    if len(sections) == 1:  # One request; a section summary plus a merge would be two in a row
+        return _generate(
+            ARTICLE_PROMPT, lambda: ARTICLE_PROMPT.format(text=text), text, "Summarization failed.", priority
+        )
+    metrics.count("model.article_sections", len(sections))
+    with ThreadPoolExecutor(max_workers=min(CHUNK_WORKERS, len(sections))) as pool:
+        partials = list(pool.map(lambda section: _summarize_section(section, priority), sections))
+    return _merge_summaries(partials, priority)
+
+
+def _summarize_section(section, priority):
+    return _generate(
+        SECTION_PROMPT, lambda: SECTION_PROMPT.format(text=section), section, "Summarization failed.", priority
+    )
+
+
+def _merge_summaries(partials, priority):
+    """Merges section summaries, in rounds while they don't fit one request."""
+    if len(partials) == 1:
+        return partials[0]
+    while True:
+        groups, size = [[]], 0
+        for partial in partials:
+            if groups[-1] and size + len(partial) > MERGE_MAX_CHARS:
+                groups.append([])
+                size = 0
+            groups[-1].append(partial)
+            size += len(partial)
+        if len(groups) == 1 or len(groups) == len(partials):  # Fits, or can't be grouped any further
+            return _merge_once("\n\n".join(partials), priority)
+        with ThreadPoolExecutor(max_workers=min(CHUNK_WORKERS, len(groups))) as pool:
+            partials = list(pool.map(lambda group: _merge_once("\n\n".join(group), priority), groups))
+
+
+def _merge_once(joined, priority):
+    return _generate(
+        MERGE_PROMPT, lambda: MERGE_PROMPT.format(text=joined), joined, "Summarization failed.", priority
+    )
+
+
+def article_sections(text, max_sections):
+    """
+    `split_sections` with the section size doubled until there are at most
+    `max_sections` (or sections reach SECTION_MAX_CHARS). Doubling keeps the
+    boundaries of a lightly edited article the same, so its cached section
+    summaries still match.
+    """
+    min_chars, max_chars = CHUNK_MIN_CHARS, CHUNK_MAX_CHARS
+    sections = split_sections(text, min_chars, max_chars)
+    while len(sections) > max_sections and max_chars * 2 <= SECTION_MAX_CHARS:
+        min_chars, max_chars = min_chars * 2, max_chars * 2
+        sections = split_sections(text, min_chars, max_chars)
+    return sections
+
+
+def split_sections(text, min_chars=CHUNK_MIN_CHARS, max_chars=CHUNK_MAX_CHARS):
+    """
+    Splits text into sections of whole paragraphs. A section closes once it
+    is past `min_chars` and its last paragraph's checksum says so (or before
+    it would pass `max_chars`), so boundaries depend on content rather than
+    position: an edit only changes the sections around it. Paragraphs longer
+    than `max_chars` are cut at sentence ends.
+    """
+    paragraphs = []
+    for paragraph in re.split(r"\s*\n\s*", text):
+        paragraph = paragraph.strip()
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind(". ", 0, max_chars)
+            cut = cut + 1 if cut > 0 else max_chars
+            paragraphs.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if paragraph:
+            paragraphs.append(paragraph)
+
+    sections, current, size = [], [], 0
+    for paragraph in paragraphs:
+        if current and size + len(paragraph) > max_chars:
+            sections.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(paragraph)
+        size += len(paragraph)
+        if size >= min_chars and zlib.crc32(paragraph.encode("utf-8")) % CHUNK_BOUNDARY_ODDS == 0:
+            sections.append("\n\n".join(current))
+            current, size = [], 0
+    if current:
+        sections.append("\n\n".join(current))
+    return sections
+
+
+def _stream(prompt, content, payload, failure, priority=INTERACTIVE):
+    """
+    Like `_generate`, but yields text as it arrives; a cached response is
+    yielded in one piece. The whole stream is read inside the scheduler, so
+    it holds its slot (and counts towards latency) until the last chunk, and
+    the chunks are handed to the caller's thread through a queue. Errors
+    before the first chunk are retried like any request; once text has been
+    yielded, a failure ends the stream with ModelError.
+    """
+    cache = get_cache()
+    key = cache_key(CACHE_MODEL, prompt, payload)
+    cached = cache.get(key)
+    if cached is not None:
+        metrics.count("model.cache_hits")
+        yield cached
+        return
+
+    chunks = queue.SimpleQueue()
+    stop = threading.Event()  # Set when the caller stops reading
+    done = object()
+
+    def attempt():
+        sent = False
+        last = None
+        with metrics.span("gemini"):
+            try:
+                for chunk in get_model().generate_content(content(), stream=True):
+                    if stop.is_set():
+                        break
+                    last = chunk  # Usage totals arrive with the final chunk
+                    text = chunk.text if chunk.parts else ""
+                    if text:
+                        chunks.put(text)
+                        sent = True
+            except Exception as e:
+                if sent:  # Can't retry: the caller already has part of the answer
+                    raise ModelError(failure) from e
+                raise
+        return last
+
+    parts = []
+    with metrics.span("model"):
+        future = get_scheduler().submit(attempt, priority)
+        future.add_done_callback(lambda _: chunks.put(done))
+        try:
+            with metrics.span("model.stream"):
+                while True:
+                    text = chunks.get()
+                    if text is done:
+                        break
+                    parts.append(text)
+                    yield text
+        finally:
+            stop.set()
+        last = future.result()
+    _count_usage(payload, last)
+
+    text = "".join(parts).strip()
+    if not text:
+        raise ModelError(failure)
+    cache.put(key, text)
+
+
+def stream_report(image, priority=INTERACTIVE):
+    """Extracts, summarizes and formats a scan in a single streamed request."""
+    encoded = encode_image(image)
+    return _stream(
+        REPORT_PROMPT,
+        lambda: [REPORT_PROMPT, _image_part(encoded)],
+        encoded.data,
+        "Report generation failed.",
+        priority,
+    )
+
+
+def stream_report_from_text(text, priority=INTERACTIVE):
+    """Summarizes and formats already extracted text in a single streamed request."""
+    return _stream(
+        REPORT_FROM_TEXT_PROMPT,
+        lambda: REPORT_FROM_TEXT_PROMPT.format(text=text),
+        text,
+        "Report generation failed.",
+        priority,
+    )
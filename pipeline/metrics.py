@@ -0,0 +1,207 @@
+"""
+Lightweight per-stage timings and counters.
+
+    with metrics.span("preprocess"):
+        ...
+    metrics.count("model.upload_bytes", len(data))
+
+Spans keep a count, error count, total and the last few hundred durations
+per stage (for percentiles and per-minute rates); counters are running
+totals. `snapshot()` feeds the Settings tab's performance panel,
+`prometheus()` renders the text exposition format (served at /metrics by
+pipeline.service), and NEWS_METRICS_LOG=path appends every span to a JSON
+lines log. With NEWS_METRICS=0, `span()` hands back a shared do-nothing
+context manager, `count()` returns immediately and `@timed` leaves the
+function untouched.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+METRICS_ENABLED = os.getenv("NEWS_METRICS", "1") != "0"
+METRICS_LOG = os.getenv("NEWS_METRICS_LOG")  # JSON lines, one per span
+RECENT_SPANS = 500  # Durations kept per stage for percentiles and rates
+RECENT_EVENTS = 50  # Latest spans of any stage, for the panel
+RATE_WINDOW = 60.0  # Seconds
+
+
+class _Stage:
+    __slots__ = ("count", "errors", "total", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=RECENT_SPANS)  # (finished at, seconds)
+
+
+class _Span:
+    __slots__ = ("registry", "name", "fields", "start")
+
+    def __init__(self, registry, name, fields):
+        self.registry = registry
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.record(self.name, time.perf_counter() - self.start, exc_type is not None, self.fields)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    def __init__(self, log_path=METRICS_LOG):
+        self._stages = {}
+        self._counters = {}
+        self._events = deque(maxlen=RECENT_EVENTS)  # (finished at, stage, seconds, error)
+        self._lock = threading.Lock()
+        self._log = None
+        if log_path:
+            os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+            self._log = open(log_path, "a", encoding="utf-8", buffering=1)
+
+    def span(self, name, **fields):
+        """Times a `with` block as one run of stage `name`; `fields` only go to the JSON log."""
+        return _Span(self, name, fields)
+
+    def record(self, name, seconds, error=False, fields=None):
+        now = time.time()
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = _Stage()
+            stage.count += 1
+            stage.errors += error
+            stage.total += seconds
+            stage.recent.append((now, seconds))
+            self._events.append((now, name, seconds, error))
+            if self._log:
+                entry = {"ts": round(now, 3), "span": name, "ms": round(seconds * 1000, 2), "error": error}
+                self._log.write(json.dumps({**entry, **(fields or {})}) + "\n")
+
+    def count(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self):
+        """{"stages": {name: {...}}, "counters": {...}, "recent": [...]} for display."""
+        now = time.time()
+        with self._lock:
+            stages = {}
+            for name, stage in self._stages.items():
+                durations = sorted(seconds for _, seconds in stage.recent)
+                window = sum(1 for finished, _ in stage.recent if now - finished <= RATE_WINDOW)
+                stages[name] = {
+                    "count": stage.count,
+                    "errors": stage.errors,
+                    "mean_ms": stage.total / stage.count * 1000,
+                    "p50_ms": _percentile(durations, 50) * 1000,
+                    "p95_ms": _percentile(durations, 95) * 1000,
+                    "last_ms": stage.recent[-1][1] * 1000,
+                    "per_minute": window * 60.0 / RATE_WINDOW,
+                }
+            recent = [
+                {"ago": now - finished, "stage": name, "ms": seconds * 1000, "error": error}
+                for finished, name, seconds, error in reversed(self._events)
+            ]
+            return {"stages": stages, "counters": dict(self._counters), "recent": recent}
+
+    def prometheus(self):
+        """All stages and counters in the Prometheus text exposition format."""
+        with self._lock:
+            stages = {name: (s.count, s.errors, s.total, sorted(d for _, d in s.recent))
+                      for name, s in self._stages.items()}
+            counters = dict(self._counters)
+        lines = [
+            "# HELP news_stage_seconds Time spent in each pipeline stage (quantiles over recent runs).",
+            "# TYPE news_stage_seconds summary",
+        ]
+        for name, (count, _, total, durations) in sorted(stages.items()):
+            label = _label(name)
+            for q in (0.5, 0.95, 0.99):
+                lines.append(f'news_stage_seconds{{stage="{label}",quantile="{q}"}} '
+                             f"{_percentile(durations, q * 100):.6f}")
+            lines.append(f'news_stage_seconds_sum{{stage="{label}"}} {total:.6f}')
+            lines.append(f'news_stage_seconds_count{{stage="{label}"}} {count}')
+        lines += ["# HELP news_stage_errors_total Stage runs that raised.", "# TYPE news_stage_errors_total counter"]
+        lines += [f'news_stage_errors_total{{stage="{_label(name)}"}} {errors}'
+                  for name, (_, errors, _, _) in sorted(stages.items())]
+        for name, value in sorted(counters.items()):
+            metric = "news_" + "".join(c if c.isalnum() else "_" for c in name) + "_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value:g}"]
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self._events.clear()
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))]
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+_default_metrics = None
+_default_lock = threading.Lock()
+
+
+def get_metrics():
+    """Returns the process-wide metrics registry (created on first use)."""
+    global _default_metrics
+    if _default_metrics is None:
+        with _default_lock:
+            if _default_metrics is None:
+                _default_metrics = Metrics()
+    return _default_metrics
+
+
+def span(name, **fields):
+    if not METRICS_ENABLED:
+        return _NULL_SPAN
+    return get_metrics().span(name, **fields)
+
+
+def count(name, value=1):
+    if METRICS_ENABLED:
+        get_metrics().count(name, value)
+
+
+def timed(name):
+    """Decorator: times every call of the function as stage `name`."""
+    def decorate(fn):
+        if not METRICS_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_metrics().span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+    return decorate
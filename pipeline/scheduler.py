@@ -0,0 +1,272 @@
+"""
+Central scheduler for model requests.
+
+Every Gemini call goes through one `Scheduler`, which
+- spaces requests with a token bucket sized to the account's requests-per-minute quota,
+- runs interactive requests (GUI clicks, API calls) ahead of batch work,
+- retries rate-limit (429) and transient errors with jittered exponential backoff,
+- adapts how many requests are in flight: halved on a 429, grown by one
+  while latency stays under target, shrunk when latency climbs.
+
+`Batcher` coalesces small requests that arrive close together so they can
+be sent as one multi-item request.
+"""
+import heapq
+import itertools
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from pipeline import metrics
+
+INTERACTIVE = 0
+BATCH = 10
+
+REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_RPM", "60"))
+BURST = int(os.getenv("GEMINI_BURST", "5"))
+MAX_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "8"))
+MIN_CONCURRENCY = 1
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0  # Seconds; doubled per attempt, with full jitter
+BACKOFF_MAX = 60.0
+TARGET_LATENCY = 15.0  # Seconds; slower responses shrink the concurrency limit
+
+_TRANSIENT = ("ServiceUnavailable", "InternalServerError", "DeadlineExceeded", "Timeout", "ConnectionError")
+
+
+class ModelError(Exception):
+    """A model request failed for good (after retries, or with an empty answer)."""
+
+
+class RateLimitError(ModelError):
+    """Still rate limited after every retry."""
+
+
+def is_rate_limit(error):
+    code = getattr(error, "code", None)
+    code = getattr(code, "value", code)  # grpc.StatusCode or int
+    return code == 429 or type(error).__name__ in ("ResourceExhausted", "TooManyRequests")
+
+
+def is_transient(error):
+    return isinstance(error, (ConnectionError, TimeoutError)) or any(n in type(error).__name__ for n in _TRANSIENT)
+
+
+class TokenBucket:
+    """`rate` tokens per second, up to `capacity` saved up."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Takes a token, sleeping until one is available. Returns the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def drain(self):
+        """Forgets saved-up tokens (after a 429 the quota is evidently spent)."""
+        with self._lock:
+            self.tokens = min(self.tokens, 0)
+
+
+class Scheduler:
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, burst=BURST, max_concurrency=MAX_CONCURRENCY,
+                 min_concurrency=MIN_CONCURRENCY, max_retries=MAX_RETRIES, target_latency=TARGET_LATENCY,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = max_concurrency  # Current adaptive concurrency limit
+        self.max_retries = max_retries
+        self.target_latency = target_latency
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.active = 0
+        self._successes = 0
+        self._queue = []  # (priority, seq, fn, future, attempt)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._ready = queue.SimpleQueue()  # Dispatched (fn, future, priority, attempt), one per token
+        self._threads = [threading.Thread(target=self._dispatch, name="model-dispatch", daemon=True)] + [
+            threading.Thread(target=self._work, name=f"model-{i}", daemon=True) for i in range(max_concurrency)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn, priority=INTERACTIVE):
+        """Queues `fn()` (one model request) and returns a Future of its result."""
+        future = Future()
+        self._push(priority, fn, future)
+        return future
+
+    def call(self, fn, priority=INTERACTIVE):
+        """Runs `fn()` through the scheduler and waits for its result."""
+        return self.submit(fn, priority).result()
+
+    def stats(self):
+        with self._cond:
+            return {"limit": self.limit, "active": self.active, "queued": len(self._queue)}
+
+    def _push(self, priority, fn, future, attempt=0):
+        with self._cond:
+            heapq.heappush(self._queue, (priority, next(self._seq), fn, future, attempt))
+            self._cond.notify_all()
+
+    def _dispatch(self):
+        """
+        Waits for a free slot and a token first and only then picks the
+        request to send, so an interactive request queued while batch work
+        waits on the quota still goes out with the next token.
+        """
+        while True:
+            with self._cond:
+                while not self._queue or self.active >= self.limit:
+                    self._cond.wait()
+            waited = self.bucket.acquire()
+            if waited:
+                metrics.count("model.throttled_seconds", waited)
+            with self._cond:
+                while True:
+                    while not self._queue or self.active >= self.limit:
+                        self._cond.wait()
+                    priority, _, fn, future, attempt = heapq.heappop(self._queue)
+                    if attempt or future.set_running_or_notify_cancel():
+                        break  # Cancelled requests don't spend the token
+                self.active += 1
+            self._ready.put((fn, future, priority, attempt))
+
+    def _work(self):
+        while True:
+            fn, future, priority, attempt = self._ready.get()
+            try:
+                self._run(fn, future, priority, attempt)
+            finally:
+                with self._cond:
+                    self.active -= 1
+                    self._cond.notify_all()
+
+    def _run(self, fn, future, priority, attempt):
+        start = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            limited = is_rate_limit(e)
+            if limited:
+                metrics.count("model.rate_limited")
+                self._on_rate_limit()
+            if not (limited or is_transient(e)) or attempt == self.max_retries:
+                future.set_exception(RateLimitError(str(e)) if limited else e)
+                return
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            print(f"⏳ Model request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            metrics.count("model.retries")
+            # Back in the queue after the delay, so the retry waits for a token like anything else
+            timer = threading.Timer(delay, self._push, (priority, fn, future, attempt + 1))
+            timer.daemon = True
+            timer.start()
+            return
+        self._on_success(time.monotonic() - start)
+        future.set_result(result)
+
+    def _on_rate_limit(self):
+        self.bucket.drain()
+        with self._cond:
+            self.limit = max(self.min_concurrency, self.limit // 2)
+            self._successes = 0
+
+    def _on_success(self, latency):
+        with self._cond:
+            if latency > self.target_latency:
+                self.limit = max(self.min_concurrency, self.limit - 1)
+                self._successes = 0
+                return
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_concurrency:
+                self.limit += 1  # One more in flight per "round" of fast responses
+                self._successes = 0
+                self._cond.notify_all()
+
+
+class Batcher:
+    """
+    Collects items submitted within `window` seconds (up to `max_items` or
+    `max_chars` of text) and hands them to `handler(items)` in one call,
+    which returns one result per item.
+    """
+
+    def __init__(self, handler, max_items=5, max_chars=6000, window=0.05):
+        self.handler = handler
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self.window = window
+        self._pending = []  # (text, future)
+        self._chars = 0
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def submit(self, text):
+        future = Future()
+        with self._lock:
+            if self._pending and self._chars + len(text) > self.max_chars:
+                self._flush_locked()
+            self._pending.append((text, future))
+            self._chars += len(text)
+            if len(self._pending) >= self.max_items:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return future
+
+    def _flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._chars = self._pending, [], 0
+        if batch:
+            threading.Thread(target=self._run, args=(batch,), daemon=True).start()
+
+    def _run(self, batch):
+        try:
+            results = self.handler([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Returns the process-wide model scheduler (started on first use)."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = Scheduler()
+        return _default_scheduler
@@ -0,0 +1,189 @@
+"""
+Local full-text search over every article the app has seen.
+
+Raw OCR text, summaries and formatted reports are kept in an SQLite FTS5
+table (porter-stemmed, BM25-ranked), updated as each job finishes, so past
+stories can be found offline in milliseconds however large the archive gets.
+
+    python -m pipeline.search --import data/news_extracted.csv
+    python -m pipeline.search "\\"air strike\\" kyiv"
+"""
+import argparse
+import csv
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+SEARCH_PATH = os.path.join("data", "cache", "search.sqlite3")
+FIELDS = ("article", "summary", "report")
+FIELD_WEIGHTS = (1.0, 2.0, 2.0)  # A hit in the summary or report says more than one in raw OCR
+SNIPPET_WORDS = 16
+DEFAULT_LIMIT = 50
+_TOKEN = re.compile(r'"([^"]+)"|(\S+)')
+
+Hit = namedtuple("Hit", "key title url snippet score")
+
+
+def to_fts_query(text):
+    """
+    Turns free user input into a safe FTS5 query: "quoted phrases" stay
+    phrases, other words must all match, and a trailing * keeps a prefix search.
+    """
+    terms = []
+    for phrase, word in _TOKEN.findall(text):
+        if phrase:
+            words = re.findall(r"\w+", phrase)
+            if words:
+                terms.append('"' + " ".join(words) + '"')
+            continue
+        prefix = word.endswith("*")
+        for part in re.findall(r"\w+", word):
+            terms.append(f'"{part}"')
+        if prefix and terms:
+            terms[-1] += "*"
+    return " ".join(terms)
+
+
+class SearchIndex:
+    def __init__(self, path=SEARCH_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                title TEXT,
+                url TEXT,
+                added REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+                article, summary, report, tokenize = 'porter unicode61'
+            );
+            """
+        )
+
+    def add(self, key, article=None, summary=None, report=None, title=None, url=None):
+        """
+        Indexes (or updates) the document `key`. Fields left as None keep
+        their previously indexed text, so each stage can add what it produced.
+        """
+        fields = dict(zip(FIELDS, (article, summary, report)))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute("SELECT id, title, url FROM docs WHERE key = ?", (key,)).fetchone()
+                if row:
+                    doc_id = row[0]
+                    old = self._conn.execute(
+                        "SELECT article, summary, report FROM docs_fts WHERE rowid = ?", (doc_id,)
+                    ).fetchone() or ("", "", "")
+                    fields = {f: new if new is not None else prev for f, new, prev in zip(FIELDS, fields.values(), old)}
+                    self._conn.execute(
+                        "UPDATE docs SET title = ?, url = ?, added = ? WHERE id = ?",
+                        (title or row[1], url or row[2], time.time(), doc_id),
+                    )
+                    self._conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+                else:
+                    doc_id = self._conn.execute(
+                        "INSERT INTO docs (key, title, url, added) VALUES (?, ?, ?, ?)",
+                        (key, title, url, time.time()),
+                    ).lastrowid
+                self._conn.execute(
+                    "INSERT INTO docs_fts (rowid, article, summary, report) VALUES (?, ?, ?, ?)",
+                    (doc_id, *(fields[f] or "" for f in FIELDS)),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def search(self, text, limit=DEFAULT_LIMIT):
+        """Returns up to `limit` Hits for the user query, best match first."""
+        query = to_fts_query(text)
+        if not query:
+            return []
+        weights = ", ".join(str(w) for w in FIELD_WEIGHTS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT docs.key, docs.title, docs.url,
+                           snippet(docs_fts, -1, '[', ']', '…', {SNIPPET_WORDS}),
+                           bm25(docs_fts, {weights}) AS rank
+                    FROM docs_fts JOIN docs ON docs.id = docs_fts.rowid
+                    WHERE docs_fts MATCH ?
+                    ORDER BY rank LIMIT ?""",
+                (query, limit),
+            ).fetchall()
+        return [Hit(key, title, url, snippet, -rank) for key, title, url, snippet, rank in rows]
+
+    def get(self, key):
+        """Returns the indexed fields of `key` as a dict, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT docs.title, docs.url, docs_fts.article, docs_fts.summary, docs_fts.report
+                   FROM docs JOIN docs_fts ON docs_fts.rowid = docs.id WHERE docs.key = ?""",
+                (key,),
+            ).fetchone()
+        if not row:
+            return None
+        return dict(zip(("title", "url") + FIELDS, row))
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def optimize(self):
+        """Merges the FTS segments; worth running after a large import."""
+        with self._lock:
+            self._conn.execute("INSERT INTO docs_fts (docs_fts) VALUES ('optimize')")
+
+    def import_csv(self, csv_path):
+        """Indexes every row of a batch CSV (Image, Article, Summary, Report)."""
+        count = 0
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row.get("Article") or row.get("Summary") or row.get("Report"):
+                    self.add(
+                        row["Image"], row.get("Article"), row.get("Summary") or None,
+                        row.get("Report") or None, title=row["Image"],
+                    )
+                    count += 1
+        self.optimize()
+        return count
+
+
+_default_index = None
+_default_lock = threading.Lock()
+
+
+def get_search_index():
+    """Returns the process-wide search index (opened on first use)."""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = SearchIndex()
+        return _default_index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the local article search index.")
+    parser.add_argument("query", nargs="?", help="Keywords or \"quoted phrases\" to search for")
+    parser.add_argument("--import", dest="csv_path", help="Index a batch CSV such as data/news_extracted.csv")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    index = get_search_index()
+    if args.csv_path:
+        print(f"✅ Indexed {index.import_csv(args.csv_path)} articles.")
+    if args.query:
+        start = time.perf_counter()
+        hits = index.search(args.query, args.limit)
+        print(f"🔍 {len(hits)} results in {(time.perf_counter() - start) * 1000:.1f} ms")
+        for hit in hits:
+            print(f"- {hit.title or hit.key}: {hit.snippet}")
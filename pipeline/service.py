@@ -0,0 +1,259 @@
+"""
+Headless HTTP service for the news pipeline (asyncio, no extra dependencies).
+
+    python -m pipeline.service --port 8765 --concurrency 8 --queue 64
+
+Endpoints (JSON in and out unless noted):
+
+    GET  /health          {"running", "queued", "served", "rejected", "model"}
+    GET  /metrics         stage timings and counters, Prometheus text format
+    POST /ocr             image bytes -> {"name", "text"}
+    POST /report          image bytes -> {"name", "report"}
+    POST /summarize       {"text"} -> {"summary"}
+    POST /summarize-url   {"url"} -> {"summary"}
+    POST /format          {"text"} -> {"report"}
+    POST /sentiment       {"text"} -> {"polarity", "subjectivity", "verdict"}
+    POST /tts             {"text"} -> audio/mpeg
+
+Pipeline steps run on a bounded thread pool. Requests beyond its size wait
+in a FIFO queue, and once the queue is full new requests get an immediate
+503 with Retry-After instead of piling up. Set NEWS_MODEL_BACKEND=stub to
+serve the offline stand-in model (see pipeline.stub) for load tests.
+"""
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+from pipeline import core, metrics
+from pipeline.scheduler import ModelError, RateLimitError, get_scheduler
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+MAX_CONCURRENCY = 8  # Pipeline steps running at once
+MAX_QUEUE = 64  # Requests allowed to wait for a free slot
+MAX_BODY_BYTES = 20 * 1024 * 1024
+REQUEST_TIMEOUT = 30  # Seconds to receive a request's headers and body
+RETRY_AFTER = 1  # Seconds suggested to clients turned away with 503
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_field(body, field):
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise HTTPError(400, "Body must be JSON.")
+    value = data.get(field) if isinstance(data, dict) else None
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(400, f'Missing "{field}".')
+    return value
+
+
+class NewsService:
+    def __init__(self, concurrency=MAX_CONCURRENCY, max_queue=MAX_QUEUE):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="pipeline")
+        self.slots = None  # asyncio.Semaphore, created on the serving loop
+        self.running = self.queued = self.served = self.rejected = 0
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/metrics"): self.prometheus,
+            ("POST", "/ocr"): self.ocr,
+            ("POST", "/report"): self.report,
+            ("POST", "/summarize"): self.summarize,
+            ("POST", "/summarize-url"): self.summarize_url,
+            ("POST", "/format"): self.format_report,
+            ("POST", "/sentiment"): self.sentiment,
+            ("POST", "/tts"): self.tts,
+        }
+
+    async def run(self, fn, *args):
+        """Runs `fn(job, *args)` on the pool, waiting in line if every slot is busy."""
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise HTTPError(503, "Server busy, retry later.")
+        self.queued += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.queued -= 1
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, fn, core.NO_JOB, *args)
+        finally:
+            self.running -= 1
+            self.slots.release()
+
+    # 🌐 **Endpoints**: each returns (content type, body bytes) or a JSON-able object
+    async def health(self, body):
+        return {
+            "running": self.running, "queued": self.queued, "served": self.served, "rejected": self.rejected,
+            "model": get_scheduler().stats(),
+        }
+
+    async def prometheus(self, body):
+        return "text/plain; version=0.0.4; charset=utf-8", metrics.get_metrics().prometheus().encode("utf-8")
+
+    async def ocr(self, body):
+        if not body:
+            raise HTTPError(400, "Send the image bytes as the request body.")
+        return {"name": core.image_name(body), "text": await self.run(core.extract, body)}
+
+    async def report(self, body):
+        if not body:
+            raise HTTPError(400, "Send the image bytes as the request body.")
+        return {"name": core.image_name(body), "report": await self.run(core.report, body)}
+
+    async def summarize(self, body):
+        return {"summary": await self.run(core.summarize, _json_field(body, "text"))}
+
+    async def summarize_url(self, body):
+        url = _json_field(body, "url")
+        if urlsplit(url).scheme not in ("http", "https"):
+            raise HTTPError(400, '"url" must be an http(s) URL.')
+        return {"summary": await self.run(core.summarize_url, url)}
+
+    async def format_report(self, body):
+        return {"report": await self.run(core.format_report, _json_field(body, "text"))}
+
+    async def sentiment(self, body):
+        return await self.run(core.sentiment_score, _json_field(body, "text"))
+
+    async def tts(self, body):
+        path = await self.run(core.speech, _json_field(body, "text"))
+        with open(path, "rb") as f:
+            return "audio/mpeg", f.read()
+
+    # 🔌 **HTTP/1.1 plumbing**
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), REQUEST_TIMEOUT)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break  # Client went away
+                except asyncio.TimeoutError:
+                    break
+                except HTTPError as e:
+                    await self._respond(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                status, payload, headers = await self._dispatch(method, path, body)
+                await self._respond(writer, status, payload, keep_alive, headers)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None  # Clean close between requests
+            raise
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "Request headers too large.")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line.")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        raw_length = headers.get("content-length") or "0"
+        if not (raw_length.isascii() and raw_length.isdigit()):
+            raise HTTPError(400, "Invalid Content-Length.")
+        length = int(raw_length)
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large.")
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method.upper(), urlsplit(target).path, body, keep_alive
+
+    async def _dispatch(self, method, path, body):
+        handler = self.routes.get((method, path))
+        try:
+            if handler is None:
+                if any(p == path for _, p in self.routes):
+                    raise HTTPError(405, "Method not allowed.")
+                raise HTTPError(404, "Not found.")
+            result = await handler(body)
+            self.served += 1
+            return 200, result, {}
+        except HTTPError as e:
+            headers = {"Retry-After": str(RETRY_AFTER)} if e.status == 503 else {}
+            return e.status, {"error": str(e)}, headers
+        except RateLimitError as e:
+            return 503, {"error": f"Model rate limited: {e}"}, {"Retry-After": str(RETRY_AFTER * 30)}
+        except ModelError as e:
+            return 502, {"error": str(e)}, {}
+        except ValueError as e:
+            return 400, {"error": str(e)}, {}
+        except Exception as e:
+            print(f"⚠️ {method} {path} failed: {e}")
+            return 500, {"error": str(e)}, {}
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive, headers=None):
+        if isinstance(payload, tuple):
+            content_type, data = payload
+        else:
+            content_type, data = "application/json", json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        lines = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(data)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + data)
+        await writer.drain()
+
+    async def serve(self, host=SERVICE_HOST, port=SERVICE_PORT, ready=None):
+        self.slots = asyncio.Semaphore(self.concurrency)
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        print(f"📡 Serving on http://{host}:{port} ({self.concurrency} workers, queue {self.max_queue})")
+        if ready:
+            ready()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the news pipeline over HTTP.")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=int(os.getenv("NEWS_SERVICE_PORT", SERVICE_PORT)))
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY, help="Pipeline steps run at once")
+    parser.add_argument("--queue", type=int, default=MAX_QUEUE, help="Requests allowed to wait before 503s")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(NewsService(args.concurrency, args.queue).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Append-only article store (replaces data/news_extracted.csv).
+
+Every write appends a new version of an article to an SQLite table in WAL
+mode, merged with the previous version, so readers never block writers and
+parallel writers never corrupt each other. Indexed lookups by key (image
+name or URL), perceptual image hash, URL and time always return the latest
+version.
+
+    python -m pipeline.store --import data/news_extracted.csv --images data/raw_images
+    python -m pipeline.store --export data/news_export.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+
+STORE_PATH = os.path.join("data", "articles.sqlite3")
+FIELDS = ("image_hash", "url", "title", "article", "summary", "report", "sentiment", "audio")
+COLUMNS = ("id", "key", "created") + FIELDS
+CSV_FIELDS = {"Article": "article", "Summary": "summary", "Report": "report"}
+
+
+def _signed(image_hash):
+    """SQLite integers are signed 64-bit; perceptual hashes use all 64 bits."""
+    return image_hash - (1 << 64) if image_hash is not None and image_hash >= 1 << 63 else image_hash
+
+
+def _row(row):
+    if row is None:
+        return None
+    record = dict(zip(COLUMNS, row))
+    if record["image_hash"] is not None and record["image_hash"] < 0:
+        record["image_hash"] += 1 << 64
+    if record["sentiment"]:
+        record["sentiment"] = json.loads(record["sentiment"])
+    return record
+
+
+class ArticleStore:
+    def __init__(self, path=STORE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL,
+                created REAL NOT NULL,
+                image_hash INTEGER,
+                url TEXT,
+                title TEXT,
+                article TEXT,
+                summary TEXT,
+                report TEXT,
+                sentiment TEXT,
+                audio TEXT
+            );
+            CREATE INDEX IF NOT EXISTS articles_key ON articles (key, id);
+            CREATE INDEX IF NOT EXISTS articles_hash ON articles (image_hash, id);
+            CREATE INDEX IF NOT EXISTS articles_url ON articles (url, id);
+            CREATE INDEX IF NOT EXISTS articles_created ON articles (created);
+            """
+        )
+        self._select = f"SELECT {', '.join(COLUMNS)} FROM articles"
+
+    def append(self, key, **fields):
+        """
+        Appends a new version of `key` with the given fields (see FIELDS);
+        fields not passed (or None) are carried over from the latest version.
+        Returns the new row id.
+        """
+        unknown = set(fields) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown article fields: {', '.join(sorted(unknown))}")
+        fields = {f: v for f, v in fields.items() if v is not None}
+        if "sentiment" in fields:
+            fields["sentiment"] = json.dumps(fields["sentiment"])
+        if "image_hash" in fields:
+            fields["image_hash"] = _signed(fields["image_hash"])
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")  # Serializes writers across processes too
+            try:
+                previous = self._conn.execute(
+                    f"SELECT {', '.join(FIELDS)} FROM articles WHERE key = ? ORDER BY id DESC LIMIT 1", (key,)
+                ).fetchone()
+                values = dict(zip(FIELDS, previous or (None,) * len(FIELDS)))
+                values.update(fields)
+                row_id = self._conn.execute(
+                    f"INSERT INTO articles (key, created, {', '.join(FIELDS)}) VALUES (?, ?{', ?' * len(FIELDS)})",
+                    (key, time.time(), *(values[f] for f in FIELDS)),
+                ).lastrowid
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row_id
+
+    def _one(self, where, params):
+        with self._lock:
+            return _row(self._conn.execute(f"{self._select} WHERE {where} ORDER BY id DESC LIMIT 1", params).fetchone())
+
+    def get(self, key):
+        """Latest version of `key` as a dict, or None."""
+        return self._one("key = ?", (key,))
+
+    def by_id(self, row_id):
+        return self._one("id = ?", (row_id,))
+
+    def by_hash(self, image_hash):
+        """Latest article whose scan has exactly this perceptual hash (see pipeline.dedup for near matches)."""
+        return self._one("image_hash = ?", (_signed(image_hash),))
+
+    def by_url(self, url):
+        return self._one("url = ?", (url,))
+
+    def between(self, start=0, end=None, limit=None):
+        """Versions written in [start, end) (Unix time), oldest first."""
+        end = time.time() + 1 if end is None else end
+        with self._lock:
+            rows = self._conn.execute(
+                f"{self._select} WHERE created >= ? AND created < ? ORDER BY created LIMIT ?",
+                (start, end, -1 if limit is None else limit),
+            ).fetchall()
+        return [_row(row) for row in rows]
+
+    def keys(self, field=None):
+        """Keys in the store (only those whose latest version has `field` set, if given)."""
+        with self._lock:
+            if field is None:
+                rows = self._conn.execute("SELECT DISTINCT key FROM articles").fetchall()
+            else:
+                if field not in FIELDS:
+                    raise ValueError(f"Unknown article field: {field}")
+                rows = self._conn.execute(
+                    f"""SELECT key FROM articles WHERE id IN (SELECT MAX(id) FROM articles GROUP BY key)
+                        AND {field} IS NOT NULL AND {field} != ''"""
+                ).fetchall()
+        return {row[0] for row in rows}
+
+    def latest(self):
+        """Yields the latest version of every article, in insertion order."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"{self._select} WHERE id IN (SELECT MAX(id) FROM articles GROUP BY key) ORDER BY id"
+            ).fetchall()
+        for row in rows:
+            yield _row(row)
+
+    def import_csv(self, csv_path, images_dir=None):
+        """
+        One-shot import of a batch CSV (Image, Article[, Summary, Report]).
+        Scans found in `images_dir` get their perceptual hash recorded.
+        """
+        if images_dir:
+            from ocr_module.engine import DEFAULT_ENGINE
+            from pipeline.dedup import phash
+
+        count = 0
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                fields = {field: row[column] for column, field in CSV_FIELDS.items() if row.get(column)}
+                image_path = os.path.join(images_dir, row["Image"]) if images_dir else None
+                if image_path and os.path.exists(image_path):
+                    fields["image_hash"] = phash(DEFAULT_ENGINE.prepare(image_path))
+                self.append(row["Image"], title=row["Image"], **fields)
+                count += 1
+        return count
+
+    def export_csv(self, csv_path):
+        """Writes the latest version of every article to a CSV for tools that still want one."""
+        count = 0
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["Image"] + list(CSV_FIELDS))
+            writer.writeheader()
+            for record in self.latest():
+                writer.writerow({"Image": record["key"], **{c: record[f] or "" for c, f in CSV_FIELDS.items()}})
+                count += 1
+        return count
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_store():
+    """Returns the process-wide article store (opened on first use)."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ArticleStore()
+        return _default_store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import into or export from the article store.")
+    parser.add_argument("--import", dest="csv_path", help="CSV to import, e.g. data/news_extracted.csv")
+    parser.add_argument("--images", default=None, help="Folder of the imported scans, to record their hashes")
+    parser.add_argument("--export", dest="export_path", help="Write the latest articles to this CSV")
+    args = parser.parse_args()
+
+    if args.csv_path:
+        print(f"✅ Imported {get_store().import_csv(args.csv_path, args.images)} articles.")
+    if args.export_path:
+        print(f"✅ Exported {get_store().export_csv(args.export_path)} articles.")
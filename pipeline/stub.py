@@ -0,0 +1,89 @@
+"""
+Offline stand-ins for Gemini and gTTS, for load tests and demos.
+
+    NEWS_MODEL_BACKEND=stub NEWS_STUB_LATENCY=0.3 python -m pipeline.service
+
+The stub model answers every prompt with deterministic text after a fixed
+delay, and stub speech writes silent MP3 frames, so the whole pipeline runs
+without API keys or network at a predictable speed. Responses are cached
+under a separate key, and audio in a separate folder, from the real ones.
+"""
+import hashlib
+import os
+import random
+import re
+import time
+
+STUB_BACKEND = os.getenv("NEWS_MODEL_BACKEND", "gemini").lower() == "stub"
+STUB_LATENCY = float(os.getenv("NEWS_STUB_LATENCY", "0.2"))  # Seconds per model request
+STUB_TTS_LATENCY = float(os.getenv("NEWS_STUB_TTS_LATENCY", "0.1"))  # Seconds per synthesized chunk
+STUB_RATE_LIMIT = float(os.getenv("NEWS_STUB_RATE_LIMIT", "0"))  # Fraction of requests answered with a 429
+STUB_STREAM_PARTS = 4
+_PACKED_ARTICLE = re.compile(r"^=== ARTICLE (\d+) ===$", re.MULTILINE)
+
+# One MPEG-1 Layer III frame (128 kbps, 44.1 kHz) with empty side info: decodes as 26 ms of silence
+_SILENT_FRAME = bytes.fromhex("fffb9064") + bytes(413)
+_FRAMES_PER_CHAR = 2  # Roughly the pace of gTTS speech
+
+
+class ResourceExhausted(Exception):
+    """Same name and code as the API's quota error, so the scheduler treats it alike."""
+
+    code = 429
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+        self.parts = [text] if text else []
+
+
+class StubModel:
+    """Mimics the parts of genai.GenerativeModel the pipeline uses."""
+
+    def __init__(self, name, latency=STUB_LATENCY, rate_limit=STUB_RATE_LIMIT):
+        self.name = name
+        self.latency = latency
+        self.rate_limit = rate_limit
+
+    def _answer(self, content):
+        parts = content if isinstance(content, list) else [content]
+        texts = [p for p in parts if isinstance(p, str)]
+        images = [p for p in parts if isinstance(p, dict)]
+        prompt = texts[0].strip().splitlines()[0] if texts else ""
+        digest = hashlib.sha1(repr([len(t) for t in texts] + [len(i["data"]) for i in images]).encode()).hexdigest()[:8]
+        source = " ".join(texts[1:]) if len(texts) > 1 else " ".join(texts[0].splitlines()[1:]) if texts else ""
+        body = " ".join(source.split()[-40:])
+        if images:
+            body = f"Text read from a {len(images[0]['data'])}-byte scan."
+        articles = _PACKED_ARTICLE.split(texts[0]) if texts else []
+        if len(articles) > 1:  # Multi-article summary request: answer each under its marker
+            return "\n".join(
+                f"=== SUMMARY {n} ===\nStub summary: {' '.join(text.split()[:30])}"
+                for n, text in zip(articles[1::2], articles[2::2])
+            )
+        return f"Stub headline {digest}.\n\n{prompt[:60]} {body}".strip()
+
+    def generate_content(self, content, stream=False):
+        if self.rate_limit and random.random() < self.rate_limit:
+            time.sleep(self.latency / 10)
+            raise ResourceExhausted("429 Resource has been exhausted (stub quota).")
+        text = self._answer(content)
+        if not stream:
+            time.sleep(self.latency)
+            return _Response(text)
+        return self._stream(text)
+
+    def _stream(self, text):
+        step = max(1, len(text) // STUB_STREAM_PARTS)
+        for i in range(0, len(text), step):
+            time.sleep(self.latency / STUB_STREAM_PARTS)
+            yield _Response(text[i:i + step])
+
+
+def stub_speech(text, output_file, latency=STUB_TTS_LATENCY):
+    """Writes silent MP3 audio about as long as the text would take to read."""
+    time.sleep(latency)
+    with open(output_file, "wb") as f:
+        f.write(_SILENT_FRAME * max(1, len(text) * _FRAMES_PER_CHAR))
+    return output_file
@@ -0,0 +1,217 @@
+"""
+Background news watcher: reports and audio ready before anyone asks.
+
+    python -m pipeline.watcher --keywords war,ceasefire --interval 900
+    python -m pipeline.watcher --keywords war --once
+
+Every `interval` seconds each keyword is polled on NewsAPI for stories
+published after the newest one already handled. Each new story is
+downloaded, summarized, written up and read out ahead of time, a few at a
+time and at batch priority, so clicks in the GUI stay ahead of it. Results
+go to the article store and to the ready list that the "Gist of What's
+Happening" tab shows. A story that fails WATCH_MAX_FAILURES times (a dead
+link, a blocked page) is given up on, so it can't hold the cursor back.
+The per-keyword cursors, failure counts and the ready list are kept in
+data/watcher.json, so a restart picks up where the last run stopped.
+The GUI runs the watcher when NEWS_WATCH_KEYWORDS is set.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from pipeline import core
+from pipeline.scheduler import BATCH
+
+WATCH_KEYWORDS = [k.strip() for k in os.getenv("NEWS_WATCH_KEYWORDS", "").split(",") if k.strip()]
+WATCH_INTERVAL = int(os.getenv("NEWS_WATCH_INTERVAL", "900"))  # Seconds between polls
+WATCH_MAX_ARTICLES = 10  # New stories prepared per keyword per poll; the rest wait for the next poll
+WATCH_MAX_FAILURES = 3  # Attempts before a story is given up on
+WATCH_WORKERS = 2  # Stories prepared at once
+READY_KEEP = 50
+FAILURES_KEEP = 500
+STATE_PATH = os.path.join("data", "watcher.json")
+
+
+class _Background(core.Job):
+    """Lets a step be cancelled with the watcher without reporting its progress."""
+
+    def __init__(self, job):
+        self.job = job
+
+    def check(self):
+        self.job.check()
+
+
+def load_state(path=STATE_PATH):
+    """
+    {"cursors": {keyword: publishedAt up to which every story is settled},
+     "failures": {url: failed attempts}, "ready": [story, ...] (newest first)}.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    return {"cursors": state.get("cursors", {}), "failures": state.get("failures", {}), "ready": state.get("ready", [])}
+
+
+def ready_reports(path=STATE_PATH):
+    return load_state(path)["ready"]
+
+
+class NewsWatcher:
+    def __init__(self, keywords=None, state_path=STATE_PATH, max_articles=WATCH_MAX_ARTICLES, workers=WATCH_WORKERS):
+        self.keywords = keywords or WATCH_KEYWORDS or ["war"]
+        self.state_path = state_path
+        self.max_articles = max_articles
+        self.workers = workers
+        self.state = load_state(state_path)
+        self._lock = threading.Lock()
+
+    def save_state(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.state_path)
+
+    def abandoned(self, url):
+        return self.state["failures"].get(url, 0) >= WATCH_MAX_FAILURES
+
+    def new_articles(self, keyword, handled):
+        """
+        Returns (stories to prepare, oldest first; every story listed since
+        the cursor as (publishedAt, url), or None if the listing was cut
+        short). NewsAPI lists newest first, so paging stops as soon as
+        `max_articles` unsettled stories are found; a backlog is worked
+        through over several polls, newest stories first. The first poll
+        of a keyword only takes the newest few.
+        """
+        from news.live_news_api import fetch_articles, iter_article_pages
+
+        cursor = self.state["cursors"].get(keyword)
+        if cursor is None:
+            pages = [fetch_articles(keyword, max_results=self.max_articles)]
+        else:  # NewsAPI's `from` is inclusive; filtered below
+            pages = iter_article_pages(keyword, **{"from": cursor})
+        articles, listed, seen = [], [], set()
+        for page in pages:
+            for article in page:
+                url, published = article.get("url"), article.get("publishedAt") or ""
+                if not (url and article.get("title")) or url in seen or (cursor is not None and published <= cursor):
+                    continue
+                seen.add(url)
+                listed.append((published, url))
+                if url not in handled and not self.abandoned(url):
+                    articles.append(article)
+            if len(articles) >= self.max_articles:
+                listed = None if cursor is not None else listed
+                break
+        articles = sorted(articles, key=lambda article: article.get("publishedAt") or "", reverse=True)
+        return sorted(articles[:self.max_articles], key=lambda article: article.get("publishedAt") or ""), listed
+
+    def record_failure(self, url, error):
+        with self._lock:
+            failures = self.state["failures"]
+            count = failures.pop(url, 0) + 1
+            failures[url] = count  # Most recent last
+            for old in list(failures)[:-FAILURES_KEEP]:
+                del failures[old]
+        if count >= WATCH_MAX_FAILURES:
+            print(f"⚠️ Watcher gave up on {url} after {count} attempts: {error}")
+        else:
+            print(f"⚠️ Watcher skipped {url} (attempt {count}): {error}")
+
+    def advance_cursor(self, keyword, listed, handled):
+        """Moves the cursor to the newest story with every story up to it prepared or given up on."""
+        cursor = self.state["cursors"].get(keyword) or ""
+        for published, url in sorted(listed):
+            if url not in handled and not self.abandoned(url):
+                break
+            cursor = max(cursor, published)
+        if cursor:
+            with self._lock:
+                self.state["cursors"][keyword] = cursor
+
+    def prepare(self, job, article):
+        """Summary, report and audio for one story; returns its ready-list entry."""
+        url, title = article["url"], article["title"]
+        step_job = _Background(job)
+        summary = core.summarize_url(step_job, url, title=title, priority=BATCH)
+        report = core.format_report(step_job, summary, doc_key=url, priority=BATCH)
+        audio = core.speech(step_job, report, doc_key=url)
+        return {"url": url, "title": title, "published": article.get("publishedAt"), "audio": audio}
+
+    def poll(self, job=core.NO_JOB):
+        """Prepares every new story once. Returns the entries that became ready."""
+        from pipeline.store import get_store
+
+        handled = get_store().keys("audio")
+        ready = []
+        for keyword in self.keywords:
+            job.check()
+            try:
+                articles, listed = self.new_articles(keyword, handled)
+            except Exception as e:
+                print(f"⚠️ Watcher couldn't fetch '{keyword}': {e}")
+                continue
+            if articles:
+                print(f"🛰️ Preparing {len(articles)} new '{keyword}' stories...")
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(self.prepare, job, article): article for article in articles}
+                for future in as_completed(futures):
+                    article = futures[future]
+                    try:
+                        entry = future.result()
+                    except Exception as e:
+                        job.check()  # Being stopped isn't the story's fault
+                        self.record_failure(article["url"], e)
+                        continue
+                    handled.add(entry["url"])
+                    ready.append(entry)
+                    with self._lock:
+                        self.state["failures"].pop(entry["url"], None)
+                        self.state["ready"] = [entry] + [
+                            e for e in self.state["ready"] if e["url"] != entry["url"]
+                        ][:READY_KEEP - 1]
+                    job.chunk(entry["url"])
+
+            if listed is not None:  # Only a full listing shows that nothing older is left
+                self.advance_cursor(keyword, listed, handled)
+            self.save_state()
+        return ready
+
+
+def watch(job=core.NO_JOB, keywords=None, interval=WATCH_INTERVAL, once=False):
+    """Polls forever (or once), calling `job.chunk(url)` whenever a story is ready."""
+    watcher = NewsWatcher(keywords)
+    while True:
+        watcher.poll(job)
+        if once:
+            return watcher.state["ready"]
+        deadline = time.monotonic() + interval
+        while time.monotonic() < deadline:
+            job.check()
+            time.sleep(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prepare reports and audio for new stories in the background.")
+    parser.add_argument("--keywords", default=",".join(WATCH_KEYWORDS) or "war", help="Comma-separated")
+    parser.add_argument("--interval", type=int, default=WATCH_INTERVAL, help="Seconds between polls")
+    parser.add_argument("--once", action="store_true", help="Poll once and exit")
+    args = parser.parse_args(argv)
+
+    keywords = [k.strip() for k in args.keywords.split(",") if k.strip()]
+    try:
+        watch(keywords=keywords, interval=args.interval, once=args.once)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
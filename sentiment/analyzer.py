@@ -0,0 +1,206 @@
+"""
+Sentence-level sentiment scoring with lazy model loading.
+
+TextBlob's pattern lexicon is only loaded the first time something is
+scored. Scores are cached on disk by text hash, and `score_many` spreads
+uncached texts over a process pool, so the whole corpus can be scored for
+the daily tone dashboard in seconds. By default every article in the
+article store is scored and its score recorded there; `--csv` scores a
+legacy batch CSV instead:
+
+    python -m sentiment.analyzer --output data/sentiment_scores.csv
+    python -m sentiment.analyzer --csv data/news_extracted.csv
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from pipeline.cache import ResponseCache, cache_key
+
+SENTIMENT_CACHE_PATH = os.path.join("data", "cache", "sentiment.sqlite3")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+ANALYZER_VERSION = "pattern-1"  # Bump to invalidate cached scores
+
+Score = namedtuple("Score", "polarity subjectivity sentences")  # sentences: [(sentence, polarity), ...]
+
+_analyzer = None
+_cache = None
+_lock = threading.Lock()
+
+
+def _get_analyzer():
+    global _analyzer
+    if _analyzer is None:
+        from textblob.en.sentiments import PatternAnalyzer  # Loads the lexicon; only when first needed
+
+        _analyzer = PatternAnalyzer()
+    return _analyzer
+
+
+def _get_cache():
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = ResponseCache(SENTIMENT_CACHE_PATH, ttl=None)
+        return _cache
+
+
+def split_sentences(text):
+    return [s.strip() for s in SENTENCE_END.split(text) if s and s.strip()]
+
+
+def _score_uncached(text):
+    """Scores every sentence; the article score is the length-weighted mean."""
+    analyzer = _get_analyzer()
+    sentences = []
+    weighted_polarity = weighted_subjectivity = total = 0
+    for sentence in split_sentences(text):
+        polarity, subjectivity = analyzer.analyze(sentence)
+        sentences.append((sentence, polarity))
+        weight = len(sentence)
+        weighted_polarity += polarity * weight
+        weighted_subjectivity += subjectivity * weight
+        total += weight
+    if not total:
+        return Score(0.0, 0.0, [])
+    return Score(weighted_polarity / total, weighted_subjectivity / total, sentences)
+
+
+def _key(text):
+    return cache_key(ANALYZER_VERSION, text)
+
+
+def _load(value):
+    data = json.loads(value)
+    return Score(data["polarity"], data["subjectivity"], [tuple(s) for s in data["sentences"]])
+
+
+def _dump(score):
+    return json.dumps(score._asdict())
+
+
+def score_text(text):
+    cache = _get_cache()
+    key = _key(text)
+    cached = cache.get(key)
+    if cached is not None:
+        return _load(cached)
+    score = _score_uncached(text)
+    cache.put(key, _dump(score))
+    return score
+
+
+def score_many(texts, workers=None, chunksize=16):
+    """Scores many texts, spreading cache misses over a process pool. Keeps input order."""
+    cache = _get_cache()
+    texts = list(texts)
+    keys = [_key(text) for text in texts]
+    scores = [None] * len(texts)
+    missing = {}
+    for i, key in enumerate(keys):
+        cached = cache.get(key)
+        if cached is not None:
+            scores[i] = _load(cached)
+        else:
+            missing.setdefault(key, []).append(i)
+
+    if missing:
+        unique = [texts[indexes[0]] for indexes in missing.values()]
+        if len(unique) < 2 * chunksize:  # Not worth starting processes
+            results = map(_score_uncached, unique)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_score_uncached, unique, chunksize=chunksize))
+        for (key, indexes), score in zip(missing.items(), results):
+            cache.put(key, _dump(score))
+            for i in indexes:
+                scores[i] = score
+    return scores
+
+
+def describe(text):
+    """Overall verdict plus the most positive and negative sentences, for the GUI."""
+    score = score_text(text)
+    polarity = score.polarity  # -1 (negative) to +1 (positive)
+
+    if polarity > 0:
+        verdict = "😀 **Positive News** (Score: {:.2f})".format(polarity)
+    elif polarity < 0:
+        verdict = "😠 **Negative News** (Score: {:.2f})".format(polarity)
+    else:
+        verdict = "😐 **Neutral News** (Score: 0.00)"
+
+    lines = [verdict]
+    if len(score.sentences) > 1:
+        most_negative = min(score.sentences, key=lambda s: s[1])
+        most_positive = max(score.sentences, key=lambda s: s[1])
+        if most_positive[1] > 0:
+            lines.append("\n➕ Most positive ({:.2f}): {}".format(most_positive[1], most_positive[0]))
+        if most_negative[1] < 0:
+            lines.append("\n➖ Most negative ({:.2f}): {}".format(most_negative[1], most_negative[0]))
+    return "\n".join(lines)
+
+
+def _write_scores(output_path, names, scores):
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Image", "Polarity", "Subjectivity", "Sentences", "NegativeSentences"])
+        for name, score in zip(names, scores):
+            negative = sum(1 for _, polarity in score.sentences if polarity < 0)
+            writer.writerow([name, f"{score.polarity:.4f}", f"{score.subjectivity:.4f}", len(score.sentences), negative])
+
+
+def score_csv(csv_path, output_path, column="Article", workers=None):
+    """Scores `column` of every row in `csv_path` and writes a per-row score CSV."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = [row for row in csv.DictReader(f) if row.get(column)]
+    scores = score_many([row[column] for row in rows], workers)
+    _write_scores(output_path, [row.get("Image", "") for row in rows], scores)
+    return scores
+
+
+def score_store(output_path=None, field="article", workers=None, store=None):
+    """
+    Scores `field` of every article in the store, records each changed score
+    on the article and, if `output_path` is given, writes a per-article score
+    CSV (keyed by image name or URL).
+    """
+    from pipeline.store import get_store
+
+    store = store or get_store()
+    records = [record for record in store.latest() if record.get(field)]
+    scores = score_many([record[field] for record in records], workers)
+    for record, score in zip(records, scores):
+        result = {"polarity": score.polarity, "subjectivity": score.subjectivity}
+        if record.get("sentiment") != result:
+            store.append(record["key"], sentiment=result)
+    if output_path:
+        _write_scores(output_path, [record["key"] for record in records], scores)
+    return scores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score the sentiment of every article in the article store.")
+    parser.add_argument("--csv", default=None, help="Score a legacy batch CSV instead of the store")
+    parser.add_argument("--output", default=None, help="Also write per-article scores to this CSV")
+    parser.add_argument("--column", default="Article", help="CSV column to score (with --csv)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.csv:
+        output = args.output or os.path.join("data", "sentiment_scores.csv")
+        scores = score_csv(args.csv, output, args.column, args.workers)
+    else:
+        output = args.output or "the article store"
+        scores = score_store(args.output, workers=args.workers)
+    if scores:
+        mean = sum(s.polarity for s in scores) / len(scores)
+        negative = sum(1 for s in scores if s.polarity < 0)
+        print(f"✅ Scored {len(scores)} articles: mean polarity {mean:+.3f}, {negative} negative → {output}")
+    else:
+        print("⚠️ No articles to score.")
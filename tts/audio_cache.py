@@ -0,0 +1,91 @@
+"""
+Content-addressed store for synthesized speech.
+
+Files are named by a hash of the text and voice settings, so an unchanged
+report (or sentence) is never synthesized twice and a file, once written,
+never changes under the media player. The store is kept under `max_bytes`
+by deleting the least recently used files.
+"""
+import hashlib
+import os
+import threading
+import uuid
+
+from pipeline.stub import STUB_BACKEND
+
+AUDIO_CACHE_DIR = os.path.join("data", "audio", "stub" if STUB_BACKEND else "cache")
+AUDIO_CACHE_MAX_BYTES = 500 * 1024 * 1024  # 500 MB
+SIDECAR_SUFFIXES = (".mouth.npy",)  # Derived files removed along with their audio
+
+
+def audio_key(text, lang="en", tld="com", slow=False):
+    return hashlib.sha256(f"{lang}|{tld}|{int(slow)}|{text}".encode("utf-8")).hexdigest()
+
+
+class AudioStore:
+    def __init__(self, root=AUDIO_CACHE_DIR, max_bytes=AUDIO_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path_for(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.mp3")
+
+    def get(self, key):
+        """Returns the stored file for `key` (marking it recently used), or None."""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, write):
+        """
+        Stores a file produced by `write(tmp_path)` under `key` and returns its
+        path. The file appears atomically, so readers never see partial audio.
+        """
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+    def evict(self, keep=()):
+        """Deletes least recently used files until the store fits in `max_bytes`."""
+        keep = {os.path.abspath(p) for p in keep}
+        with self._lock:
+            entries = []
+            total = 0
+            for dirpath, _, filenames in os.walk(self.root):
+                for name in filenames:
+                    if not name.endswith(".mp3"):
+                        continue
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    total += stat.st_size
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if os.path.abspath(path) in keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    continue  # Still open elsewhere (e.g. Windows media player); try next time
+                for suffix in SIDECAR_SUFFIXES:
+                    try:
+                        os.remove(path + suffix)
+                    except OSError:
+                        pass
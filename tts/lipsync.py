@@ -0,0 +1,84 @@
+"""
+Mouth-open timelines for the avatar, computed from the audio itself.
+
+The MP3 is decoded to 8 kHz mono with ffmpeg, cut into FRAME_MS frames,
+and each frame's RMS is compared with a threshold relative to the clip's
+loud frames, so the mouth stays shut during pauses. The timeline is saved
+next to the audio file (`<audio>.mouth.npy`) and looked up in O(1) by
+playback position.
+"""
+import os
+import shutil
+import subprocess
+import uuid
+
+import numpy as np
+
+FRAME_MS = 40
+SAMPLE_RATE = 8000
+OPEN_LEVEL = 0.25  # Share of the clip's loud (95th percentile) RMS that counts as speech
+MIN_RMS = 0.01  # Absolute floor so near-silent clips don't flap
+
+
+class MouthTimeline:
+    __slots__ = ("states", "frame_ms")
+
+    def __init__(self, states, frame_ms=FRAME_MS):
+        self.states = states
+        self.frame_ms = frame_ms
+
+    def is_open(self, position_ms):
+        index = position_ms // self.frame_ms
+        return 0 <= index < len(self.states) and bool(self.states[index])
+
+
+def decode_samples(audio_path, rate=SAMPLE_RATE):
+    """Decodes audio to mono float32 samples in [-1, 1] via ffmpeg, or None if unavailable."""
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return None
+    result = subprocess.run(
+        [ffmpeg, "-v", "quiet", "-i", audio_path, "-f", "s16le", "-ac", "1", "-ar", str(rate), "-"],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        return None
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def build_states(samples, rate=SAMPLE_RATE, frame_ms=FRAME_MS):
+    """Vectorized per-frame RMS → uint8 mouth states (1 = open)."""
+    frame_len = rate * frame_ms // 1000
+    frames = len(samples) // frame_len
+    if frames == 0:
+        return np.zeros(0, dtype=np.uint8)
+    framed = samples[:frames * frame_len].reshape(frames, frame_len)
+    rms = np.sqrt(np.mean(framed * framed, axis=1))
+    threshold = max(MIN_RMS, OPEN_LEVEL * float(np.percentile(rms, 95)))
+    return (rms > threshold).astype(np.uint8)
+
+
+def timeline_path(audio_path):
+    return f"{audio_path}.mouth.npy"
+
+
+def load_timeline(audio_path):
+    """
+    Returns the MouthTimeline stored next to `audio_path`, building and
+    saving it on first use. Returns None if the audio can't be decoded.
+    """
+    path = timeline_path(audio_path)
+    if os.path.exists(path):
+        try:
+            return MouthTimeline(np.load(path))
+        except (OSError, ValueError):
+            pass  # Corrupt or half-written; rebuild
+
+    samples = decode_samples(audio_path)
+    if samples is None:
+        return None
+    states = build_states(samples)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.npy"
+    np.save(tmp_path, states)
+    os.replace(tmp_path, path)
+    return MouthTimeline(states)
@@ -1,14 +1,109 @@
-from gtts import gTTS
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tts.audio_cache import audio_key
+from pipeline import metrics
+from pipeline.stub import STUB_BACKEND, stub_speech
 
-def generate_speech(text, output_file="news_report.mp3"):
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+MIN_CHUNK_CHARS = 20  # Shorter sentences are merged into the previous chunk
+TTS_WORKERS = 4
+TTS_LANG = "en"
+TTS_TLD = "com"  # Accent, e.g. "co.uk" or "co.in"
 
-    tts = gTTS(text=text, lang="en", slow=False)
+def generate_speech(text, output_file="news_report.mp3", lang=TTS_LANG, tld=TTS_TLD, slow=False):
+    if STUB_BACKEND:
+        return stub_speech(text, output_file)
+    from gtts import gTTS  # Lazy import: keeps app startup fast
+
+    tts = gTTS(text=text, lang=lang, tld=tld, slow=slow)
     tts.save(output_file)
     print(f"Speech saved as {output_file}")
 
     return output_file
 
+def split_into_chunks(text, min_chars=MIN_CHUNK_CHARS):
+    """
+    Splits text into one chunk per sentence/paragraph, folding fragments
+    shorter than `min_chars` into the previous chunk. gTTS already requests
+    ~100 characters at a time, so sentence-sized chunks cost no extra
+    requests, start playing sooner and are reused when only some sentences
+    of a report change.
+    """
+    sentences = [s.strip() for s in SENTENCE_END.split(text) if s and s.strip()]
+    chunks = []
+    for sentence in sentences:
+        if chunks and len(sentence) < min_chars:
+            chunks[-1] = f"{chunks[-1]} {sentence}"
+        else:
+            chunks.append(sentence)
+    return chunks
+
+def synthesize_cached(text, store, lang=TTS_LANG, tld=TTS_TLD, slow=False):
+    """Returns the stored audio for `text`, synthesizing it only on a miss."""
+    key = audio_key(text, lang, tld, slow)
+    path = store.get(key)
+    if path:
+        metrics.count("tts.cache_hits")
+        return path
+    metrics.count("tts.cache_misses")
+    with metrics.span("tts.chunk"):
+        return store.put(key, lambda tmp_path: generate_speech(text, tmp_path, lang, tld, slow))
+
+def generate_speech_chunks(text, store, lang=TTS_LANG, tld=TTS_TLD, slow=False, max_workers=TTS_WORKERS, progress=None):
+    """
+    Synthesizes the chunks of `text` concurrently, reusing any chunk already
+    in `store`. Yields chunk file paths in reading order as soon as each one
+    (and all before it) is ready. `progress(done, total)` is called from
+    worker threads whenever any chunk finishes.
+    """
+    chunks = split_into_chunks(text)
+    if not chunks:
+        return
+    total = len(chunks)
+    done = 0
+    lock = threading.Lock()
+
+    def on_done(_):
+        nonlocal done
+        with lock:
+            done += 1
+            count = done
+        if progress:
+            progress(count, total)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = []
+        for chunk in chunks:
+            future = pool.submit(synthesize_cached, chunk, store, lang, tld, slow)
+            future.add_done_callback(on_done)
+            futures.append(future)
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+def report_audio_path(text, store, lang=TTS_LANG, tld=TTS_TLD, slow=False):
+    """Returns the stored full-report audio for `text`, or None if not built yet."""
+    return store.get(audio_key(text, lang, tld, slow))
+
+def store_report_audio(text, chunk_paths, store, lang=TTS_LANG, tld=TTS_TLD, slow=False):
+    """Joins synthesized chunks into the report's own file in `store`."""
+    path = store.put(audio_key(text, lang, tld, slow), lambda tmp_path: join_mp3(chunk_paths, tmp_path))
+    store.evict(keep=[path, *chunk_paths])
+    return path
+
+def join_mp3(paths, output_file):
+    """Concatenates MP3 chunks into one file (MP3 frames are self-contained)."""
+    with open(output_file, "wb") as out:
+        for path in paths:
+            with open(path, "rb") as f:
+                out.write(f.read())
+    return output_file
+
 if __name__ == "__main__":
     sample_news = """Breaking News: International peace talks have failed, leading to heightened 
     tensions in the region. World leaders are scrambling to find a diplomatic resolution."""